@@ -1,280 +1,93 @@
+import json
+import os
+
 import numpy as np
 import pandas as pd
 import streamlit as st
-from math import exp, factorial
-from scipy.stats import nbinom 
-
-class FootballPoissonPredictor:
-    def __init__(self):
-        # 确保所有联赛数据都包含overdispersion参数
-        self.league_data = {
-            '英超': {'home_goal_rate': 1.65, 'away_goal_rate': 1.5076, 'overdispersion': 1.25},
-            '西甲': {'home_goal_rate': 1.5376, 'away_goal_rate': 1.2165, 'overdispersion': 1.30},
-            '意甲': {'home_goal_rate': 1.4518, 'away_goal_rate': 1.2718, 'overdispersion': 1.28},
-            '法甲': {'home_goal_rate': 1.65875, 'away_goal_rate': 1.46313, 'overdispersion': 1.35},
-            '德甲': {'home_goal_rate': 1.688125, 'away_goal_rate': 1.538125, 'overdispersion': 1.20},
-            '英冠': {'home_goal_rate': 1.454286, 'away_goal_rate': 1.047619, 'overdispersion': 1.40},
-            '德乙': {'home_goal_rate': 1.7125, 'away_goal_rate': 1.47125, 'overdispersion': 1.45},
-            '法乙': {'home_goal_rate': 1.5925, 'away_goal_rate': 1.089375, 'overdispersion': 1.50}
-        }
-       
-        # 完整的球队数据
-        self.team_data = {
-            '英超': {
-                '利物浦': {'home_goals': 2.21, 'home_conceded': 0.84, 'away_goals': 2.32, 'away_conceded': 1.32},
-                '阿森纳': {'home_goals': 1.84, 'home_conceded': 0.89, 'away_goals': 1.79, 'away_conceded': 0.89},
-                '曼城': {'home_goals': 2.26, 'home_conceded': 1.21, 'away_goals': 1.53, 'away_conceded': 1.11},
-                '切尔西': {'home_goals': 1.84, 'home_conceded': 0.95, 'away_goals': 1.53, 'away_conceded': 1.32},
-                '纽卡斯尔联': {'home_goals': 2.11, 'home_conceded': 1.05, 'away_goals': 1.47, 'away_conceded': 1.42},
-                '阿斯顿维拉': {'home_goals': 1.79, 'home_conceded': 1.05, 'away_goals': 1.26, 'away_conceded': 1.63},
-                '诺丁汉森林': {'home_goals': 1.37, 'home_conceded': 0.84, 'away_goals': 1.68, 'away_conceded': 1.58},
-                '布莱顿': {'home_goals': 1.58, 'home_conceded': 1.37, 'away_goals': 1.89, 'away_conceded': 1.74},
-                '伯恩茅斯': {'home_goals': 1.21, 'home_conceded': 0.84, 'away_goals': 1.84, 'away_conceded': 1.58},
-                '布伦特福德': {'home_goals': 2.11, 'home_conceded': 1.84, 'away_goals': 1.37, 'away_conceded': 1.16},
-                '富勒姆': {'home_goals': 1.42, 'home_conceded': 1.58, 'away_goals': 1.42, 'away_conceded': 1.26},
-                '水晶宫': {'home_goals': 1.26, 'home_conceded': 1.37, 'away_goals': 1.42, 'away_conceded': 1.32},
-                '埃弗顿': {'home_goals': 1.37, 'home_conceded': 1.21, 'away_goals': 0.84, 'away_conceded': 1.11},
-                '西汉姆联': {'home_goals': 1.21, 'home_conceded': 1.79, 'away_goals': 1.21, 'away_conceded': 1.47},
-                '曼联': {'home_goals': 1.21, 'home_conceded': 1.47, 'away_goals': 1.11, 'away_conceded': 1.37},
-                '狼队': {'home_goals': 1.42, 'home_conceded': 1.68, 'away_goals': 1.42, 'away_conceded': 1.95},
-                '热刺': {'home_goals': 1.84, 'home_conceded': 1.84, 'away_goals': 1.53, 'away_conceded': 1.58}
-            },
-            '西甲': {
-                '巴塞罗那': {'home_goals': 2.74, 'home_conceded': 1.05, 'away_goals': 2.63, 'away_conceded': 1.00},
-                '皇家马德里': {'home_goals': 2.37, 'home_conceded': 1.00, 'away_goals': 1.74, 'away_conceded': 1.00},
-                '马德里竞技': {'home_goals': 2.21, 'home_conceded': 0.79, 'away_goals': 1.37, 'away_conceded': 0.79},
-                '毕尔巴鄂竞技': {'home_goals': 1.68, 'home_conceded': 0.68, 'away_goals': 1.16, 'away_conceded': 0.84},
-                '比利亚雷亚尔': {'home_goals': 2.26, 'home_conceded': 1.42, 'away_goals': 1.47, 'away_conceded': 1.26},
-                '皇家贝蒂斯': {'home_goals': 1.68, 'home_conceded': 1.11, 'away_goals': 1.32, 'away_conceded': 1.53},
-                '塞尔塔': {'home_goals': 1.68, 'home_conceded': 1.11, 'away_goals': 1.42, 'away_conceded': 1.89},
-                '巴列卡诺': {'home_goals': 1.26, 'home_conceded': 1.37, 'away_goals': 0.89, 'away_conceded': 1.00},
-                '奥萨苏纳': {'home_goals': 1.74, 'home_conceded': 1.21, 'away_goals': 0.79, 'away_conceded': 1.53},
-                '马洛卡': {'home_goals': 1.05, 'home_conceded': 1.11, 'away_goals': 0.79, 'away_conceded': 1.21},
-                '皇家社会': {'home_goals': 1.05, 'home_conceded': 1.05, 'away_goals': 0.79, 'away_conceded': 1.37},
-                '巴伦西亚': {'home_goals': 1.37, 'home_conceded': 1.05, 'away_goals': 0.95, 'away_conceded': 1.79},
-                '赫塔菲': {'home_goals': 0.79, 'home_conceded': 1.00, 'away_goals': 1.00, 'away_conceded': 1.05},
-                '西班牙人': {'home_goals': 1.21, 'home_conceded': 1.05, 'away_goals': 0.89, 'away_conceded': 1.63},
-                '阿拉维斯': {'home_goals': 0.74, 'home_conceded': 0.89, 'away_goals': 1.26, 'away_conceded': 1.63},
-                '赫罗纳': {'home_goals': 1.42, 'home_conceded': 1.58, 'away_goals': 0.89, 'away_conceded': 1.58},
-                '塞维利亚': {'home_goals': 0.89, 'home_conceded': 1.21, 'away_goals': 1.32, 'away_conceded': 1.68}
-            },
-            '意甲': {
-                '那不勒斯': {'home_goals': 1.68, 'home_conceded': 0.68, 'away_goals': 1.42, 'away_conceded': 0.74},
-                '国际米兰': {'home_goals': 2.11, 'home_conceded': 1.11, 'away_goals': 2.05, 'away_conceded': 0.74},
-                '亚特兰大': {'home_goals': 1.89, 'home_conceded': 1.26, 'away_goals': 2.21, 'away_conceded': 0.68},
-                '尤文图斯': {'home_goals': 1.63, 'home_conceded': 0.79, 'away_goals': 1.42, 'away_conceded': 1.05},
-                '罗马': {'home_goals': 1.95, 'home_conceded': 0.79, 'away_goals': 1.00, 'away_conceded': 1.05},
-                '佛罗伦萨': {'home_goals': 1.68, 'home_conceded': 0.95, 'away_goals': 1.47, 'away_conceded': 1.21},
-                '拉齐奥': {'home_goals': 1.74, 'home_conceded': 1.37, 'away_goals': 1.47, 'away_conceded': 1.21},
-                'AC米兰': {'home_goals': 1.58, 'home_conceded': 0.84, 'away_goals': 1.63, 'away_conceded': 1.42},
-                '博洛尼亚': {'home_goals': 1.74, 'home_conceded': 0.95, 'away_goals': 1.26, 'away_conceded': 1.53},
-                '科莫': {'home_goals': 1.47, 'home_conceded': 1.37, 'away_goals': 1.11, 'away_conceded': 1.37},
-                '都灵': {'home_goals': 0.89, 'home_conceded': 0.95, 'away_goals': 1.16, 'away_conceded': 1.42},
-                '乌迪内斯': {'home_goals': 1.16, 'home_conceded': 1.42, 'away_goals': 1.00, 'away_conceded': 1.53},
-                '热那亚': {'home_goals': 1.11, 'home_conceded': 1.32, 'away_goals': 0.84, 'away_conceded': 1.26},
-                '维罗纳': {'home_goals': 0.79, 'home_conceded': 1.89, 'away_goals': 1.00, 'away_conceded': 1.58},
-                '卡利亚里': {'home_goals': 1.26, 'home_conceded': 1.47, 'away_goals': 0.84, 'away_conceded': 1.47},
-                '帕尔马': {'home_goals': 1.32, 'home_conceded': 1.47, 'away_goals': 1.00, 'away_conceded': 1.58},
-                '莱切': {'home_goals': 0.68, 'home_conceded': 1.63, 'away_goals': 0.74, 'away_conceded': 1.42}
-            },
-            '法甲': {
-                '巴黎圣日耳曼': {'home_goals': 2.65, 'home_conceded': 0.94, 'away_goals': 2.76, 'away_conceded': 1.12},
-                '马赛': {'home_goals': 2.41, 'home_conceded': 1.35, 'away_goals': 1.94, 'away_conceded': 1.41},
-                '摩纳哥': {'home_goals': 2.24, 'home_conceded': 0.94, 'away_goals': 1.47, 'away_conceded': 1.47},
-                '尼斯': {'home_goals': 2.24, 'home_conceded': 0.88, 'away_goals': 1.65, 'away_conceded': 1.53},
-                '里尔': {'home_goals': 1.82, 'home_conceded': 1.06, 'away_goals': 1.24, 'away_conceded': 1.06},
-                '里昂': {'home_goals': 2.18, 'home_conceded': 1.24, 'away_goals': 1.65, 'away_conceded': 1.47},
-                '斯特拉斯堡': {'home_goals': 1.94, 'home_conceded': 1.18, 'away_goals': 1.35, 'away_conceded': 1.41},
-                '朗斯': {'home_goals': 1.12, 'home_conceded': 1.29, 'away_goals': 1.35, 'away_conceded': 1.00},
-                '布雷斯特': {'home_goals': 1.82, 'home_conceded': 1.24, 'away_goals': 1.24, 'away_conceded': 2.24},
-                '图卢兹': {'home_goals': 1.18, 'home_conceded': 1.29, 'away_goals': 1.41, 'away_conceded': 1.24},
-                '欧塞尔': {'home_goals': 1.41, 'home_conceded': 1.00, 'away_goals': 1.41, 'away_conceded': 2.00},
-                '雷恩': {'home_goals': 1.47, 'home_conceded': 1.00, 'away_goals': 1.53, 'away_conceded': 1.94},
-                '南特': {'home_goals': 1.12, 'home_conceded': 1.06, 'away_goals': 1.18, 'away_conceded': 2.00},
-                '昂热': {'home_goals': 1.06, 'home_conceded': 1.94, 'away_goals': 0.82, 'away_conceded': 1.18},
-                '勒阿弗尔': {'home_goals': 0.88, 'home_conceded': 2.41, 'away_goals': 1.47, 'away_conceded': 1.76},
-                '兰斯': {'home_goals': 1.00, 'home_conceded': 1.47, 'away_goals': 0.94, 'away_conceded': 1.29}
-            },
-            '德甲': {
-                '拜仁慕尼黑': {'home_goals': 3.12, 'home_conceded': 0.94, 'away_goals': 2.71, 'away_conceded': 0.94},
-                '勒沃库森': {'home_goals': 2.12, 'home_conceded': 1.29, 'away_goals': 2.12, 'away_conceded': 1.24},
-                '法兰克福': {'home_goals': 2.41, 'home_conceded': 1.29, 'away_goals': 1.59, 'away_conceded': 1.41},
-                '多特蒙德': {'home_goals': 2.59, 'home_conceded': 1.12, 'away_goals': 1.59, 'away_conceded': 1.88},
-                '弗莱堡': {'home_goals': 1.88, 'home_conceded': 1.53, 'away_goals': 1.00, 'away_conceded': 1.59},
-                '美因茨': {'home_goals': 1.41, 'home_conceded': 1.06, 'away_goals': 1.82, 'away_conceded': 1.47},
-                'RB莱比锡': {'home_goals': 1.94, 'home_conceded': 1.35, 'away_goals': 1.18, 'away_conceded': 1.47},
-                '云达不莱梅': {'home_goals': 1.24, 'home_conceded': 1.53, 'away_goals': 1.94, 'away_conceded': 1.82},
-                '斯图加特': {'home_goals': 2.06, 'home_conceded': 1.59, 'away_goals': 1.71, 'away_conceded': 1.53},
-                '门兴格拉德巴赫': {'home_goals': 1.71, 'home_conceded': 1.53, 'away_goals': 1.53, 'away_conceded': 1.82},
-                '沃尔夫斯堡': {'home_goals': 1.59, 'home_conceded': 1.76, 'away_goals': 1.71, 'away_conceded': 1.41},
-                '奥格斯堡': {'home_goals': 1.06, 'home_conceded': 1.18, 'away_goals': 1.00, 'away_conceded': 1.82},
-                '柏林联合': {'home_goals': 1.06, 'home_conceded': 1.35, 'away_goals': 1.00, 'away_conceded': 1.65},
-                '圣保利': {'home_goals': 0.59, 'home_conceded': 1.12, 'away_goals': 1.06, 'away_conceded': 1.29},
-                '霍芬海姆': {'home_goals': 1.47, 'home_conceded': 2.12, 'away_goals': 1.24, 'away_conceded': 1.88},
-                '海登海姆': {'home_goals': 0.76, 'home_conceded': 1.94, 'away_goals': 1.41, 'away_conceded': 1.82}
-            },
-            '英冠': {
-                '利兹联': {'home_goals': 2.65, 'home_conceded': 0.52, 'away_goals': 1.48, 'away_conceded': 0.78},
-                '伯恩利': {'home_goals': 1.52, 'home_conceded': 0.35, 'away_goals': 1.48, 'away_conceded': 0.35},
-                '谢菲尔德联队': {'home_goals': 1.43, 'home_conceded': 0.74, 'away_goals': 1.30, 'away_conceded': 0.83},
-                '桑德兰': {'home_goals': 1.39, 'home_conceded': 0.78, 'away_goals': 1.13, 'away_conceded': 1.13},
-                '考文垂': {'home_goals': 1.74, 'home_conceded': 1.04, 'away_goals': 1.04, 'away_conceded': 1.48},
-                '布里斯托城': {'home_goals': 1.57, 'home_conceded': 0.87, 'away_goals': 1.00, 'away_conceded': 1.52},
-                '布莱克本': {'home_goals': 1.48, 'home_conceded': 1.00, 'away_goals': 0.89, 'away_conceded': 1.09},
-                '米尔沃尔': {'home_goals': 1.17, 'home_conceded': 0.83, 'away_goals': 0.87, 'away_conceded': 1.30},
-                '西布罗姆维奇': {'home_goals': 1.43, 'home_conceded': 0.87, 'away_goals': 1.04, 'away_conceded': 1.17},
-                '米德尔斯堡': {'home_goals': 1.35, 'home_conceded': 1.00, 'away_goals': 1.43, 'away_conceded': 1.43},
-                '斯旺西': {'home_goals': 1.43, 'home_conceded': 1.04, 'away_goals': 0.78, 'away_conceded': 1.39},
-                '谢周三': {'home_goals': 1.30, 'home_conceded': 1.39, 'away_goals': 1.30, 'away_conceded': 1.61},
-                '诺维奇': {'home_goals': 2.26, 'home_conceded': 1.48, 'away_goals': 0.83, 'away_conceded': 1.48},
-                '沃特福德': {'home_goals': 1.17, 'home_conceded': 0.96, 'away_goals': 1.13, 'away_conceded': 1.70},
-                '女王公园巡游者': {'home_goals': 1.35, 'home_conceded': 1.48, 'away_goals': 0.96, 'away_conceded': 1.26},
-                '朴茨茅斯': {'home_goals': 1.43, 'home_conceded': 0.91, 'away_goals': 1.09, 'away_conceded': 2.17},
-                '牛津联队': {'home_goals': 1.35, 'home_conceded': 1.26, 'away_goals': 0.78, 'away_conceded': 1.57},
-                '斯托克城': {'home_goals': 1.26, 'home_conceded': 1.09, 'away_goals': 0.70, 'away_conceded': 1.61},
-                '德比郡': {'home_goals': 1.09, 'home_conceded': 0.78, 'away_goals': 1.00, 'away_conceded': 1.65},
-                '普雷斯顿': {'home_goals': 1.13, 'home_conceded': 0.96, 'away_goals': 0.96, 'away_conceded': 1.61},
-                '赫尔城': {'home_goals': 1.04, 'home_conceded': 1.22, 'away_goals': 0.87, 'away_conceded': 1.13}
-            },
-            '德乙': {
-                '科隆': {'home_goals': 1.94, 'home_conceded': 1.06, 'away_goals': 1.18, 'away_conceded': 1.18},
-                '汉堡': {'home_goals': 2.59, 'home_conceded': 1.18, 'away_goals': 2.00, 'away_conceded': 1.41},
-                '埃弗斯堡': {'home_goals': 2.29, 'home_conceded': 1.47, 'away_goals': 1.47, 'away_conceded': 0.71},
-                '帕德博恩': {'home_goals': 1.76, 'home_conceded': 1.35, 'away_goals': 1.53, 'away_conceded': 1.35},
-                '马格德堡': {'home_goals': 1.65, 'home_conceded': 1.71, 'away_goals': 2.12, 'away_conceded': 1.35},
-                '杜塞尔多夫': {'home_goals': 1.71, 'home_conceded': 1.59, 'away_goals': 1.65, 'away_conceded': 1.47},
-                '凯泽斯劳滕': {'home_goals': 2.00, 'home_conceded': 1.29, 'away_goals': 1.29, 'away_conceded': 1.94},
-                '卡尔斯鲁厄': {'home_goals': 1.82, 'home_conceded': 1.41, 'away_goals': 1.53, 'away_conceded': 1.82},
-                '汉威诺96': {'home_goals': 1.35, 'home_conceded': 0.88, 'away_goals': 1.06, 'away_conceded': 1.24},
-                '纽伦堡': {'home_goals': 1.76, 'home_conceded': 1.65, 'away_goals': 1.76, 'away_conceded': 1.71},
-                '柏林赫塔': {'home_goals': 1.18, 'home_conceded': 1.41, 'away_goals': 1.71, 'away_conceded': 1.59},
-                '达姆斯塔特': {'home_goals': 1.71, 'home_conceded': 1.18, 'away_goals': 1.59, 'away_conceded': 2.06},
-                '菲尔特': {'home_goals': 1.53, 'home_conceded': 1.76, 'away_goals': 1.12, 'away_conceded': 1.71},
-                '沙克尔04': {'home_goals': 1.82, 'home_conceded': 2.06, 'away_goals': 1.24, 'away_conceded': 1.59},
-                '普鲁士明斯特': {'home_goals': 1.00, 'home_conceded': 1.00, 'away_goals': 1.35, 'away_conceded': 1.53},
-                '布伦瑞克': {'home_goals': 1.29, 'home_conceded': 1.53, 'away_goals': 0.94, 'away_conceded': 2.24}
-            },
-            '法乙': {
-                '梅斯': {'home_goals': 2.18, 'home_conceded': 0.88, 'away_goals': 1.59, 'away_conceded': 1.12},
-                '巴黎足球会': {'home_goals': 2.00, 'home_conceded': 0.94, 'away_goals': 1.24, 'away_conceded': 1.00},
-                '洛里昂': {'home_goals': 2.88, 'home_conceded': 0.71, 'away_goals': 1.12, 'away_conceded': 1.12},
-                '甘冈': {'home_goals': 1.94, 'home_conceded': 1.12, 'away_goals': 1.41, 'away_conceded': 1.53},
-                'USL敦刻尔克': {'home_goals': 1.65, 'home_conceded': 0.82, 'away_goals': 1.12, 'away_conceded': 1.53},
-                '阿纳西': {'home_goals': 1.41, 'home_conceded': 0.94, 'away_goals': 1.06, 'away_conceded': 1.59},
-                '拉瓦勒': {'home_goals': 1.41, 'home_conceded': 1.06, 'away_goals': 1.18, 'away_conceded': 1.18},
-                '巴斯蒂亚': {'home_goals': 1.71, 'home_conceded': 0.82, 'away_goals': 0.82, 'away_conceded': 1.35},
-                '格勒诺布尔': {'home_goals': 1.47, 'home_conceded': 1.00, 'away_goals': 1.06, 'away_conceded': 1.59},
-                '特鲁瓦': {'home_goals': 1.06, 'home_conceded': 0.76, 'away_goals': 1.06, 'away_conceded': 1.24},
-                '亚眠': {'home_goals': 1.53, 'home_conceded': 1.18, 'away_goals': 0.71, 'away_conceded': 1.76},
-                '阿雅克肖': {'home_goals': 1.29, 'home_conceded': 1.00, 'away_goals': 0.47, 'away_conceded': 1.47},
-                '波城': {'home_goals': 1.18, 'home_conceded': 1.12, 'away_goals': 1.12, 'away_conceded': 2.00},
-                '罗德兹': {'home_goals': 1.65, 'home_conceded': 1.53, 'away_goals': 1.65, 'away_conceded': 1.65},
-                '红星': {'home_goals': 1.12, 'home_conceded': 1.29, 'away_goals': 1.06, 'away_conceded': 1.71},
-                '克莱蒙': {'home_goals': 1.00, 'home_conceded': 1.12, 'away_goals': 0.76, 'away_conceded': 1.59}
-            }
-        }
-    def get_teams_by_league(self, league):
-        """获取指定联赛的所有球队"""
-        if league in self.team_data:
-            return list(self.team_data[league].keys())
-        return []
-    
-    def calculate_expected_goals(self, home_team, away_team, league):
-        """计算预期进球数"""
-        if league not in self.league_data:
-            raise ValueError(f"不支持该联赛: {league}")
-        
-        if league not in self.team_data or home_team not in self.team_data[league] or away_team not in self.team_data[league]:
-            raise ValueError(f"球队数据不存在，请检查球队名称是否正确")
-        
-        league_rates = self.league_data[league]
-        home_stats = self.team_data[league][home_team]
-        away_stats = self.team_data[league][away_team]
-        
-        # 计算进攻强度和防守强度
-        home_attack_strength = home_stats['home_goals'] / league_rates['home_goal_rate']
-        home_defense_strength = home_stats['home_conceded'] / league_rates['away_goal_rate']
-        
-        away_attack_strength = away_stats['away_goals'] / league_rates['away_goal_rate']
-        away_defense_strength = away_stats['away_conceded'] / league_rates['home_goal_rate']
-        
-        # 计算预期进球
-        home_xG = home_attack_strength * away_defense_strength * league_rates['home_goal_rate']
-        away_xG = away_attack_strength * home_defense_strength * league_rates['away_goal_rate']
-        
-        return home_xG, away_xG
-
-    def monte_carlo_simulation(self, home_xG, away_xG, num_simulations=10000):
-        """泊松分布蒙特卡洛模拟"""
-        home_goals_sim = np.random.poisson(home_xG, num_simulations)
-        away_goals_sim = np.random.poisson(away_xG, num_simulations)
-        total_goals_sim = home_goals_sim + away_goals_sim
-        return home_goals_sim, away_goals_sim, total_goals_sim
-
-    def monte_carlo_simulation_negative_binomial(self, home_xG, away_xG, league, num_simulations=10000):
-        """负二项分布蒙特卡洛模拟（按联赛调整）"""
-        # 添加防御性编程，确保联赛存在
-        if league not in self.league_data:
-            raise ValueError(f"联赛 '{league}' 不在支持的联赛列表中")
-            
-        # 获取联赛特定的过离散参数，如果不存在则使用默认值1.3
-        overdispersion = self.league_data.get(league, {}).get('overdispersion', 1.3)
-        
-        # 计算负二项分布参数
-        def get_nbinom_params(mean, overdispersion):
-            variance = mean * overdispersion
-            p = mean / variance
-            n = mean * p / (1 - p)
-            return n, p
-        
-        n_home, p_home = get_nbinom_params(home_xG, overdispersion)
-        n_away, p_away = get_nbinom_params(away_xG, overdispersion)
-        
-        # 模拟进球数
-        home_goals_sim = nbinom.rvs(n_home, p_home, size=num_simulations)
-        away_goals_sim = nbinom.rvs(n_away, p_away, size=num_simulations)
-        total_goals_sim = home_goals_sim + away_goals_sim
-        
-        return home_goals_sim, away_goals_sim, total_goals_sim
 
-    def calculate_probabilities_from_simulation(self, home_goals_sim, away_goals_sim, total_goals_sim, num_simulations):
-        """从模拟结果计算概率"""
-        unique_goals, counts = np.unique(total_goals_sim, return_counts=True)
-        goal_probabilities = counts / num_simulations
-        
-        prob_0_1 = np.sum((total_goals_sim <= 1)) / num_simulations
-        prob_2_3 = np.sum((total_goals_sim >= 2) & (total_goals_sim <= 3)) / num_simulations
-        prob_4_6 = np.sum((total_goals_sim >= 4) & (total_goals_sim <= 6)) / num_simulations
-        prob_7_plus = np.sum(total_goals_sim >= 7) / num_simulations
-        prob_gt_2_5 = np.sum(total_goals_sim > 2.5) / num_simulations
-        prob_gt_3_5 = np.sum(total_goals_sim > 3.5) / num_simulations
-        
-        most_common_goals = np.argmax(np.bincount(total_goals_sim))
-        
-        score_counts = {}
-        for i in range(len(home_goals_sim)):
-            score = f"{home_goals_sim[i]}-{away_goals_sim[i]}"
-            score_counts[score] = score_counts.get(score, 0) + 1
-        
-        most_likely_score = max(score_counts, key=score_counts.get)
-        most_likely_score_prob = score_counts[most_likely_score] / num_simulations
-        
-        return {
-            'unique_goals': unique_goals,
-            'goal_probabilities': goal_probabilities,
-            'prob_0_1': prob_0_1,
-            'prob_2_3': prob_2_3,
-            'prob_4_6': prob_4_6,
-            'prob_7_plus': prob_7_plus,
-            'prob_gt_2_5': prob_gt_2_5,
-            'prob_gt_3_5': prob_gt_3_5,
-            'most_common_goals': most_common_goals,
-            'most_likely_score': most_likely_score,
-            'most_likely_score_prob': most_likely_score_prob
-        }
-
-def display_results(probs, num_simulations, distribution_name, league=None, total_goals_sim=None, home_team=None, away_team=None):
-    """显示预测结果"""
+from football_predictor import BIVARIATE_COVARIANCE, DIXON_COLES_RHO, SENSITIVITY_MARKETS, FootballPoissonPredictor, SimulationCache
+from instrumentation import profile_call, recording, stage, timed
+from random_streams import BIT_GENERATORS
+from strength_fitter import DEFAULT_RESULTS_PATH, StrengthFitter
+from team_store import TeamDataStore
+
+CALCULATION_METHODS = ["蒙特卡洛模拟", "精确解析计算"]
+
+DEFAULT_SEED = 2024
+
+SIMULATION_MODES = ["固定次数", "自适应精度"]
+
+# 相关比分模型分页的模型名称与分布标识
+CORRELATED_MODELS = {"Dixon-Coles": 'dixon_coles', "双变量泊松": 'bivariate_poisson'}
+
+STRENGTH_SOURCES = ["球队统计数据", "历史赛果拟合"]
+
+# 蒙特卡洛抽样方式的显示名称与标识
+SAMPLING_MODES = {"普通随机": 'random', "对偶变量": 'antithetic', "拉丁超立方": 'latin_hypercube',
+                  "Sobol 拟随机": 'sobol', "重要性抽样（尾部）": 'importance'}
+
+# 等效样本量表中的市场名称
+ERROR_MARKET_NAMES = {'home_win': "主胜", 'draw': "平局", 'away_win': "客胜", 'prob_gt_2_5': "大于2.5球",
+                      'prob_7_plus': "7+球", 'margin_3_plus': "净胜3球以上"}
+
+# 敏感性分析中市场的显示名称
+SENSITIVITY_MARKET_NAMES = {'home_win': "主胜", 'draw': "平局", 'away_win': "客胜", 'prob_gt_2_5': "大于2.5球",
+                            'prob_gt_3_5': "大于3.5球", 'both_teams_score': "双方都进球", 'prob_7_plus': "7+球",
+                            'margin_3_plus': "净胜3球以上"}
+
+# 价格表中市场与选项的显示名称
+MARKET_NAMES = {'1X2': "胜平负", 'btts': "双方进球", 'total': "大小球", 'asian_handicap': "亚洲让球"}
+SELECTION_NAMES = {'draw': "平局", 'yes': "是", 'no': "否", 'over': "大球", 'under': "小球"}
+
+@timed()
+def build_goal_tables(probs, num_simulations):
+    """构建总进球数柱状图数据和详细概率表（不依赖 Streamlit 页面，可单独做基准测试）"""
+    # 处理7+球的数据
+    chart_data_list = []
+    for goals, prob in zip(probs['unique_goals'], probs['goal_probabilities'] * 100):
+        if goals <= 6:
+            chart_data_list.append({'总进球数': goals, '概率(%)': prob})
+        else:
+            if not any(item['总进球数'] == '7+' for item in chart_data_list):
+                prob_7_plus_total = probs['prob_7_plus'] * 100
+                chart_data_list.append({'总进球数': '7+', '概率(%)': prob_7_plus_total})
+    
+    detail_data = []
+    for goals, prob in zip(probs['unique_goals'], probs['goal_probabilities']):
+        if goals <= 6:
+            row = {'总进球数': goals, '概率(%)': f"{prob*100:.2f}%"}
+            if num_simulations is not None:
+                row['模拟次数'] = round(prob * num_simulations)
+            detail_data.append(row)
+        else:
+            if not any(item['总进球数'] == '7+' for item in detail_data):
+                row = {'总进球数': '7+', '概率(%)': f"{probs['prob_7_plus']*100:.2f}%"}
+                if num_simulations is not None:
+                    row['模拟次数'] = round(probs['prob_7_plus'] * num_simulations)
+                detail_data.append(row)
+    
+    return pd.DataFrame(chart_data_list), pd.DataFrame(detail_data)
+
+@timed()
+def build_goal_chart(chart_data, distribution_name):
+    """构建总进球数 Altair 柱状图，未安装 altair 时返回 None"""
+    try:
+        import altair as alt
+    except ImportError:
+        return None
+    return alt.Chart(chart_data).mark_bar().encode(
+        x=alt.X('总进球数:O', title='总进球数', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('概率(%):Q', title='概率(%)'),
+        tooltip=['总进球数', '概率(%)']
+    ).properties(
+        width=600,
+        height=400,
+        title=f'{distribution_name}总进球数概率分布'
+    )
+
+@timed()
+def display_results(probs, num_simulations, distribution_name, league=None, home_team=None, away_team=None):
+    """显示预测结果（num_simulations 为 None 表示精确解析结果）"""
     st.markdown(f"### {distribution_name}预测结果")
     
     if league and "负二项" in distribution_name:
@@ -287,7 +100,21 @@ def display_results(probs, num_simulations, distribution_name, league=None, tota
     with col2:
         st.metric("最有可能比分", probs['most_likely_score'], f"{probs['most_likely_score_prob']*100:.1f}%")
     with col3:
-        st.metric("模拟次数", f"{num_simulations:,}")
+        if num_simulations is None:
+            st.metric("计算方式", "精确解析")
+        else:
+            st.metric("模拟次数", f"{num_simulations:,}")
+            if probs.standard_error is not None:
+                st.caption(f"关键市场最大标准误: {probs.standard_error*100:.2f}%")
+            if probs.effective_sample_size is not None:
+                # 等效样本量 = 普通随机抽样达到相同标准误所需的次数
+                ess = pd.Series(probs.effective_sample_size)
+                with st.expander(f"最小等效样本量: {ess.min():,.0f}"):
+                    st.dataframe(pd.DataFrame({
+                        '市场': ess.index.map(ERROR_MARKET_NAMES),
+                        '等效样本量': ess.round(),
+                        '相对抽样次数': (ess / num_simulations).round(1)
+                    }), use_container_width=True, hide_index=True)
     
     # 第二行：概率分布（两列布局）
     col_left, col_right = st.columns(2)
@@ -308,63 +135,28 @@ def display_results(probs, num_simulations, distribution_name, league=None, tota
     st.markdown("---")
     st.subheader("📈📈 详细概率分布")
     
-    # 处理7+球的数据
-    chart_data_list = []
-    for goals, prob in zip(probs['unique_goals'], probs['goal_probabilities'] * 100):
-        if goals <= 6:
-            chart_data_list.append({'总进球数': goals, '概率(%)': prob})
-        else:
-            if not any(item['总进球数'] == '7+' for item in chart_data_list):
-                prob_7_plus_total = probs['prob_7_plus'] * 100
-                chart_data_list.append({'总进球数': '7+', '概率(%)': prob_7_plus_total})
+    chart_data, detail_df = build_goal_tables(probs, num_simulations)
     
-    chart_data = pd.DataFrame(chart_data_list)
-    
-    try:
-        import altair as alt
-        chart = alt.Chart(chart_data).mark_bar().encode(
-            x=alt.X('总进球数:O', title='总进球数', axis=alt.Axis(labelAngle=0)),
-            y=alt.Y('概率(%):Q', title='概率(%)'),
-            tooltip=['总进球数', '概率(%)']
-        ).properties(
-            width=600,
-            height=400,
-            title=f'{distribution_name}总进球数概率分布'
-        )
+    chart = build_goal_chart(chart_data, distribution_name)
+    if chart is not None:
         st.altair_chart(chart, use_container_width=True)
-    except ImportError:
+    else:
         st.bar_chart(chart_data.set_index('总进球数'))
     
     st.subheader("详细概率分布表")
-    detail_data = []
-    for goals, prob in zip(probs['unique_goals'], probs['goal_probabilities'] * 100):
-        if goals <= 6:
-            detail_data.append({
-                '总进球数': goals,
-                '概率(%)': f"{prob:.2f}%",
-                '模拟次数': np.sum(total_goals_sim == goals) if total_goals_sim is not None else 0
-            })
-        else:
-            if not any(item['总进球数'] == '7+' for item in detail_data):
-                count_7_plus = np.sum(total_goals_sim >= 7) if total_goals_sim is not None else 0
-                detail_data.append({
-                    '总进球数': '7+',
-                    '概率(%)': f"{probs['prob_7_plus']*100:.2f}%",
-                    '模拟次数': count_7_plus
-                })
-    
-    detail_df = pd.DataFrame(detail_data)
     st.dataframe(detail_df, use_container_width=True, hide_index=True)
     
     # 新增的比赛结果概率分析
     st.markdown("---")
     st.subheader("比赛结果概率分析")
     
-    # 计算主胜、平局、客胜概率
-    if home_team and away_team and 'home_goals_sim' in probs and 'away_goals_sim' in probs:
-        home_wins = np.sum(probs['home_goals_sim'] > probs['away_goals_sim']) / num_simulations
-        draws = np.sum(probs['home_goals_sim'] == probs['away_goals_sim']) / num_simulations
-        away_wins = np.sum(probs['home_goals_sim'] < probs['away_goals_sim']) / num_simulations
+    # 计算主胜、平局、客胜概率（由预先构建的净胜球累计表查询）
+    if home_team and away_team:
+        markets = probs.markets
+        diff_at_least = markets.diff_at_least
+        diff_at_most = markets.diff_at_most
+        
+        home_wins, draws, away_wins = markets.match_result()
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -376,33 +168,238 @@ def display_results(probs, num_simulations, distribution_name, league=None, tota
         
         # 计算净胜球概率
         st.subheader("净胜球概率分析")
-        goal_diffs = probs['home_goals_sim'] - probs['away_goals_sim']
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric(f"{home_team}净胜1球或以上", f"{np.sum(goal_diffs >= 1)/num_simulations*100:.1f}%")
+            st.metric(f"{home_team}净胜1球或以上", f"{diff_at_least(1)*100:.1f}%")
         with col2:
-            st.metric(f"{home_team}净胜2球或以上", f"{np.sum(goal_diffs >= 2)/num_simulations*100:.1f}%")
+            st.metric(f"{home_team}净胜2球或以上", f"{diff_at_least(2)*100:.1f}%")
         with col3:
-            st.metric(f"{home_team}净胜3球或以上", f"{np.sum(goal_diffs >= 3)/num_simulations*100:.1f}%")
+            st.metric(f"{home_team}净胜3球或以上", f"{diff_at_least(3)*100:.1f}%")
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric(f"{away_team}净胜1球或以上", f"{np.sum(goal_diffs <= -1)/num_simulations*100:.1f}%")
+            st.metric(f"{away_team}净胜1球或以上", f"{diff_at_most(-1)*100:.1f}%")
         with col2:
-            st.metric(f"{away_team}净胜2球或以上", f"{np.sum(goal_diffs <= -2)/num_simulations*100:.1f}%")
+            st.metric(f"{away_team}净胜2球或以上", f"{diff_at_most(-2)*100:.1f}%")
         with col3:
-            st.metric(f"{away_team}净胜3球或以上", f"{np.sum(goal_diffs <= -3)/num_simulations*100:.1f}%")
+            st.metric(f"{away_team}净胜3球或以上", f"{diff_at_most(-3)*100:.1f}%")
+        
+        # 完整价格表：胜平负、双方进球、大小球与亚洲让球（含四分之一盘），一次查询生成
+        with st.expander("完整价格表（公平赔率）"):
+            st.metric("双方都进球概率", f"{markets.both_teams_to_score()*100:.1f}%")
+            ladder = markets.price_ladder()
+            st.dataframe(pd.DataFrame({
+                '市场': ladder['market'].map(MARKET_NAMES),
+                '盘口': ladder['line'],
+                '选项': ladder['selection'].map({'home': home_team, 'away': away_team, **SELECTION_NAMES}),
+                '赢(%)': (ladder['win'] * 100).round(2),
+                '走盘(%)': (ladder['push'] * 100).round(2),
+                '输(%)': (ladder['lose'] * 100).round(2),
+                '公平赔率': ladder['fair_odds'].round(3)
+            }), use_container_width=True, hide_index=True)
+def display_season_simulation(league, seed):
+    """赛季模拟分页：模拟整个联赛赛程并显示积分与名次概率"""
+    st.markdown(f"### {league}赛季模拟")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        num_seasons = st.slider("模拟赛季数", min_value=1000, max_value=50000, value=5000, step=1000)
+    with col2:
+        distribution_name = st.radio("进球分布", ["泊松分布", "负二项分布"], horizontal=True, key='season_distribution')
+    
+    if st.button("开始赛季模拟"):
+        distribution = 'poisson' if distribution_name == "泊松分布" else 'negative_binomial'
+        with st.spinner("正在模拟赛季..."):
+            st.session_state.season_result = (league, st.session_state.predictor.simulate_season(
+                league, num_seasons, distribution, seed=seed
+            ))
+    
+    if st.session_state.get('season_result') and st.session_state.season_result[0] == league:
+        summary, position_probs, _ = st.session_state.season_result[1]
+        table = pd.DataFrame({
+            '球队': summary['team'],
+            '预期积分': summary['expected_points'].round(1),
+            '预期名次': summary['expected_position'].round(1),
+            '夺冠概率(%)': (summary['title'] * 100).round(1),
+            '前四概率(%)': (summary['top_4'] * 100).round(1),
+            '降级概率(%)': (summary['relegation'] * 100).round(1)
+        })
+        st.dataframe(table, use_container_width=True, hide_index=True)
+        
+        st.subheader("名次概率分布(%)")
+        st.dataframe((position_probs.loc[summary['team']] * 100).round(1), use_container_width=True)
+
+
+@timed()
+def build_sensitivity_frame(grid, market, dispersion_index):
+    """把敏感性网格中一个过离散参数切片展开为热力图长表（主队缩放, 客队缩放, 概率(%)）"""
+    probs = pd.DataFrame(grid['markets'][market][dispersion_index] * 100,
+                         index=grid['home_scales'].round(4), columns=grid['away_scales'].round(4))
+    probs = probs.rename_axis(index='主队预期进球缩放', columns='客队预期进球缩放')
+    return probs.stack().rename('概率(%)').reset_index()
+
+
+def build_sensitivity_heatmap(frame, title):
+    """构建敏感性热力图，未安装 altair 时返回 None"""
+    try:
+        import altair as alt
+    except ImportError:
+        return None
+    return alt.Chart(frame).mark_rect().encode(
+        x=alt.X('客队预期进球缩放:O', title='客队预期进球缩放', axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('主队预期进球缩放:O', title='主队预期进球缩放', sort='descending'),
+        color=alt.Color('概率(%):Q', scale=alt.Scale(scheme='viridis')),
+        tooltip=['主队预期进球缩放', '客队预期进球缩放', alt.Tooltip('概率(%):Q', format='.2f')]
+    ).properties(height=450, title=title)
+
+
+def display_sensitivity_analysis(league, home_team, away_team, home_xG, away_xG):
+    """敏感性分析分页：主客队预期进球缩放 × 过离散参数的整张网格一次广播计算，按市场显示热力图"""
+    st.markdown(f"### {home_team} vs {away_team} 敏感性分析")
+    league_dispersion = st.session_state.predictor.get_overdispersion(league)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        home_range = st.slider("主队预期进球缩放", min_value=0.5, max_value=1.5, value=(0.9, 1.1), step=0.01)
+    with col2:
+        away_range = st.slider("客队预期进球缩放", min_value=0.5, max_value=1.5, value=(0.9, 1.1), step=0.01)
+    with col3:
+        steps = st.slider("缩放网格点数", min_value=3, max_value=41, value=21, step=2)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        dispersion_range = st.slider("过离散参数范围", min_value=1.0, max_value=3.0,
+                                     value=(max(1.0, round(league_dispersion - 0.2, 2)), round(league_dispersion + 0.2, 2)),
+                                     step=0.05, help="1.0 为泊松分布，大于 1 为负二项分布")
+    with col2:
+        dispersion_steps = st.slider("过离散参数网格点数", min_value=1, max_value=11, value=5)
+    with col3:
+        market = st.selectbox("市场", SENSITIVITY_MARKETS, format_func=SENSITIVITY_MARKET_NAMES.get)
+    
+    grid = st.session_state.predictor.sensitivity_grid(
+        home_xG, away_xG, np.linspace(*home_range, steps), np.linspace(*away_range, steps),
+        np.linspace(*dispersion_range, dispersion_steps)
+    )
+    
+    dispersions = grid['overdispersions']
+    dispersion_index = st.select_slider(
+        "显示的过离散参数", options=range(len(dispersions)),
+        value=int(np.abs(dispersions - league_dispersion).argmin()),
+        format_func=lambda index: f"{dispersions[index]:.2f}"
+    )
+    st.caption(f"联赛 [{league}] 当前过离散参数: {league_dispersion} | "
+               f"基准预期进球: 主队 {home_xG:.3f}，客队 {away_xG:.3f}")
+    
+    market_probs = grid['markets'][market] * 100
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("网格最低概率", f"{market_probs.min():.1f}%")
+    with col2:
+        st.metric("网格最高概率", f"{market_probs.max():.1f}%")
+    with col3:
+        st.metric("当前切片概率跨度", f"{np.ptp(market_probs[dispersion_index]):.1f}%")
+    
+    frame = build_sensitivity_frame(grid, market, dispersion_index)
+    title = f"{SENSITIVITY_MARKET_NAMES[market]}概率（过离散参数 {dispersions[dispersion_index]:.2f}）"
+    chart = build_sensitivity_heatmap(frame, title)
+    if chart is not None:
+        st.altair_chart(chart, use_container_width=True)
+    
+    with st.expander("网格数据表(%)"):
+        st.dataframe(frame.pivot(index='主队预期进球缩放', columns='客队预期进球缩放', values='概率(%)')
+                     .sort_index(ascending=False).round(2), use_container_width=True)
+
+
+@st.cache_resource
+def get_simulation_cache():
+    """所有会话共享的模拟结果缓存"""
+    return SimulationCache()
+
+
+@st.cache_resource
+def get_team_store():
+    """所有会话共享的球队数据存储"""
+    return TeamDataStore()
+
+
+@st.cache_resource
+def get_strength_fitter():
+    """所有会话共享的历史赛果强度拟合器（读取 data/results.csv）"""
+    return StrengthFitter.from_csv(DEFAULT_RESULTS_PATH)
+
+
+def display_instrumentation(recorder, profile_text=None):
+    """在侧边栏显示本次运行的各阶段耗时、计数器和 cProfile 结果"""
+    with st.sidebar:
+        st.markdown("**各阶段耗时**")
+        st.dataframe(pd.DataFrame(recorder.stage_records()).round(3), use_container_width=True, hide_index=True)
+        if recorder.counters:
+            st.markdown("**计数器**")
+            st.json(recorder.counters)
+        if profile_text:
+            with st.expander("cProfile 结果"):
+                st.code(profile_text)
+        st.download_button("下载 JSON 日志", "\n".join(json.dumps(event, ensure_ascii=False) for event in recorder.events()),
+                           file_name="timings.jsonl", mime="application/json")
+
+
 def main():
     st.set_page_config(page_title="足球蒙特卡洛预测器", page_icon="⚽⚽", layout="wide")
     st.title("⚽⚽ 足球比赛进球数预测器（蒙特卡洛模拟）")
     
-    # 初始化预测器
+    # 性能分析（默认关闭）：记录本次运行各阶段耗时并输出结构化日志，可选 cProfile
+    with st.sidebar:
+        st.subheader("性能分析")
+        instrument = st.checkbox("记录各阶段耗时", key='instrument')
+        capture_profile = st.checkbox("cProfile 分析本次运行", key='capture_profile', disabled=not instrument)
+    
+    if not instrument:
+        render_page()
+        return
+    
+    profile_text = None
+    with recording() as recorder:
+        with stage('page'):
+            if capture_profile:
+                _, profile_text = profile_call(render_page)
+            else:
+                render_page()
+    recorder.emit()
+    display_instrumentation(recorder, profile_text)
+
+
+def render_page():
+    """页面主体：输入、预期进球和各分页"""
+    # 初始化预测器（模拟结果缓存和球队数据在所有会话间共享）
     if 'predictor' not in st.session_state:
-        st.session_state.predictor = FootballPoissonPredictor()
+        st.session_state.predictor = FootballPoissonPredictor(cache=get_simulation_cache(), store=get_team_store())
+    
+    # 存在本地赛果文件时，可以改用时间衰减泊松回归拟合的球队强度
+    if os.path.exists(DEFAULT_RESULTS_PATH):
+        strength_source = st.radio("球队强度", STRENGTH_SOURCES, horizontal=True,
+                                   help="历史赛果拟合：按时间衰减权重对 data/results.csv 做泊松回归极大似然估计")
+        if strength_source != st.session_state.get('strength_source', STRENGTH_SOURCES[0]):
+            if strength_source == "历史赛果拟合":
+                st.session_state.predictor.use_fitted_strengths(get_strength_fitter())
+            else:
+                st.session_state.predictor.reset_strengths()
+            st.session_state.strength_source = strength_source
+            # 已算出的预期进球来自切换前的强度，按新强度重新计算，保证各分页使用同一个模型
+            if st.session_state.get('simulation_done'):
+                try:
+                    st.session_state.home_xG, st.session_state.away_xG = st.session_state.predictor.calculate_expected_goals(
+                        st.session_state.home_team, st.session_state.away_team, st.session_state.league
+                    )
+                except ValueError as e:
+                    # 例如赛果中没有该球队：清除旧结果，需要重新选择对阵
+                    for key in ('home_xG', 'away_xG'):
+                        st.session_state.pop(key, None)
+                    st.session_state.simulation_done = False
+                    st.warning(str(e))
     
     # 用户输入部分
-    with st.container():
+    with st.container(), stage('page.inputs'):
         col1, col2, col3 = st.columns([1, 1, 1])
         
         with col1:
@@ -415,8 +412,31 @@ def main():
         with col3:
             away_team = st.selectbox("选择客队", teams, index=1 if len(teams) > 1 else 0)
         
-        num_simulations = st.slider("模拟次数", min_value=1000, max_value=100000, 
-                                   value=10000, step=1000)
+        simulation_mode = st.radio("模拟模式", SIMULATION_MODES, horizontal=True,
+                                   help="自适应精度：分块抽样，直到主胜/平/客胜、大于2.5球和最可能比分的标准误低于目标值")
+        
+        tolerance = None
+        if simulation_mode == "自适应精度":
+            num_simulations = None
+            tolerance = st.number_input("目标标准误", min_value=0.0002, max_value=0.02, value=0.002,
+                                        step=0.0005, format="%.4f")
+        else:
+            num_simulations = st.slider("模拟次数", min_value=1000, max_value=100000, 
+                                       value=10000, step=1000)
+        
+        col_seed, col_generator, col_sampling = st.columns(3)
+        with col_seed:
+            seed = st.number_input("随机种子", min_value=0, value=DEFAULT_SEED, step=1,
+                                   help="相同种子下结果可复现，重复查询直接读取缓存")
+        with col_generator:
+            bit_generator = st.selectbox("随机数生成器", list(BIT_GENERATORS))
+        with col_sampling:
+            sampling = SAMPLING_MODES[st.selectbox(
+                "抽样方式", list(SAMPLING_MODES),
+                help="方差缩减抽样对比分矩阵逆变换，用更少的抽样达到相同精度；重要性抽样侧重 7+ 球、净胜3球以上等尾部市场"
+            )]
+        if bit_generator != st.session_state.predictor.bit_generator:
+            st.session_state.predictor.reseed(bit_generator=bit_generator)
         
         if st.button("开始模拟预测", type="primary"):
             try:
@@ -436,48 +456,117 @@ def main():
             st.info(f"**预期进球:** 主队 {st.session_state.home_xG:.3f} | 客队 {st.session_state.away_xG:.3f}")
     
     # 创建分页
-    tab1, tab2 = st.tabs(["泊松分布预测", "负二项分布预测"])
+    tab1, tab2, tab_correlated, tab_sensitivity, tab3 = st.tabs(["泊松分布预测", "负二项分布预测", "相关比分模型", "敏感性分析", "赛季模拟"])
     
     # 泊松分布分页
-    with tab1:
+    with tab1, stage('page.poisson_tab'):
         if hasattr(st.session_state, 'simulation_done') and st.session_state.simulation_done:
-            home_goals_sim, away_goals_sim, total_goals_sim = st.session_state.predictor.monte_carlo_simulation(
-                st.session_state.home_xG, st.session_state.away_xG, num_simulations
-            )
-            
-            probs = st.session_state.predictor.calculate_probabilities_from_simulation(
-                home_goals_sim, away_goals_sim, total_goals_sim, num_simulations
-            )
-            probs['home_goals_sim'] = home_goals_sim
-            probs['away_goals_sim'] = away_goals_sim
+            method = st.radio("计算方式", CALCULATION_METHODS, horizontal=True, key='poisson_method')
             
-            display_results(
-                probs, num_simulations, "泊松分布", 
-                total_goals_sim=total_goals_sim,
-                home_team=st.session_state.home_team,
-                away_team=st.session_state.away_team
-            )
+            if method == "精确解析计算":
+                probs = st.session_state.predictor.calculate_exact_probabilities(
+                    st.session_state.home_xG, st.session_state.away_xG, distribution='poisson'
+                )
+                
+                display_results(
+                    probs, None, "泊松分布", 
+                    home_team=st.session_state.home_team,
+                    away_team=st.session_state.away_team
+                )
+            else:
+                probs = st.session_state.predictor.predict_match(
+                    st.session_state.home_team, st.session_state.away_team, st.session_state.league,
+                    'poisson', num_simulations, int(seed), tolerance, sampling=sampling
+                )
+                
+                display_results(
+                    probs, probs.num_simulations, "泊松分布", 
+                    home_team=st.session_state.home_team,
+                    away_team=st.session_state.away_team
+                )
     
     # 负二项分布分页
-    with tab2:
+    with tab2, stage('page.negative_binomial_tab'):
         if hasattr(st.session_state, 'simulation_done') and st.session_state.simulation_done:
-            home_goals_sim, away_goals_sim, total_goals_sim = st.session_state.predictor.monte_carlo_simulation_negative_binomial(
-                st.session_state.home_xG, st.session_state.away_xG, st.session_state.league, num_simulations
-            )
+            method = st.radio("计算方式", CALCULATION_METHODS, horizontal=True, key='negative_binomial_method')
             
-            probs = st.session_state.predictor.calculate_probabilities_from_simulation(
-                home_goals_sim, away_goals_sim, total_goals_sim, num_simulations
-            )
-            probs['home_goals_sim'] = home_goals_sim
-            probs['away_goals_sim'] = away_goals_sim
+            if method == "精确解析计算":
+                probs = st.session_state.predictor.calculate_exact_probabilities(
+                    st.session_state.home_xG, st.session_state.away_xG, st.session_state.league, 'negative_binomial'
+                )
+                
+                display_results(
+                    probs, None, "负二项分布", 
+                    st.session_state.league, 
+                    home_team=st.session_state.home_team,
+                    away_team=st.session_state.away_team
+                )
+            else:
+                probs = st.session_state.predictor.predict_match(
+                    st.session_state.home_team, st.session_state.away_team, st.session_state.league,
+                    'negative_binomial', num_simulations, int(seed), tolerance, sampling=sampling
+                )
+                
+                display_results(
+                    probs, probs.num_simulations, "负二项分布", 
+                    st.session_state.league, 
+                    st.session_state.home_team,
+                    st.session_state.away_team
+                )
+    
+    # 相关比分模型分页（Dixon-Coles / 双变量泊松）
+    with tab_correlated, stage('page.correlated_tab'):
+        if hasattr(st.session_state, 'simulation_done') and st.session_state.simulation_done:
+            col_model, col_param = st.columns(2)
+            with col_model:
+                model_name = st.radio("模型", list(CORRELATED_MODELS), horizontal=True, key='correlated_model')
+            with col_param:
+                if CORRELATED_MODELS[model_name] == 'dixon_coles':
+                    rho = st.slider("低比分修正参数 ρ", min_value=-0.3, max_value=0.1, value=DIXON_COLES_RHO, step=0.01,
+                                    help="负值提高 0-0、1-1 的概率，降低 1-0、0-1 的概率")
+                    covariance = BIVARIATE_COVARIANCE
+                else:
+                    covariance = st.slider("共同进球分量 λ3（协方差）", min_value=0.0, max_value=0.5, value=BIVARIATE_COVARIANCE, step=0.01,
+                                           help="主客队进球共享的泊松分量，越大比分越正相关")
+                    rho = DIXON_COLES_RHO
+            method = st.radio("计算方式", CALCULATION_METHODS, horizontal=True, key='correlated_method')
             
-            display_results(
-                probs, num_simulations, "负二项分布", 
-                st.session_state.league, 
-                total_goals_sim,
-                st.session_state.home_team,
-                st.session_state.away_team
+            distribution = CORRELATED_MODELS[model_name]
+            if method == "精确解析计算":
+                probs = st.session_state.predictor.calculate_exact_probabilities(
+                    st.session_state.home_xG, st.session_state.away_xG, distribution=distribution,
+                    rho=rho, covariance=covariance
+                )
+                
+                display_results(
+                    probs, None, model_name, 
+                    home_team=st.session_state.home_team,
+                    away_team=st.session_state.away_team
+                )
+            else:
+                probs = st.session_state.predictor.predict_match(
+                    st.session_state.home_team, st.session_state.away_team, st.session_state.league,
+                    distribution, num_simulations, int(seed), tolerance, rho=rho, covariance=covariance,
+                    sampling=sampling
+                )
+                
+                display_results(
+                    probs, probs.num_simulations, model_name, 
+                    home_team=st.session_state.home_team,
+                    away_team=st.session_state.away_team
+                )
+    
+    # 敏感性分析分页
+    with tab_sensitivity, stage('page.sensitivity_tab'):
+        if hasattr(st.session_state, 'simulation_done') and st.session_state.simulation_done:
+            display_sensitivity_analysis(
+                st.session_state.league, st.session_state.home_team, st.session_state.away_team,
+                st.session_state.home_xG, st.session_state.away_xG
             )
+    
+    # 赛季模拟分页
+    with tab3, stage('page.season_tab'):
+        display_season_simulation(league, int(seed))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""基准测试：模拟、汇总和结果表格构建的耗时、吞吐量与峰值内存（无界面、离线运行）
+
+用法示例:
+    python benchmark.py --save-baseline          # 运行并保存为基线
+    python benchmark.py                          # 运行并与基线比较，有退化时返回码为 1
+    python benchmark.py --quick --filter poisson # 只跑小规模的泊松用例
+
+每个用例至少运行 repeat 次且累计至少 MIN_CASE_SECONDS 秒，耗时取单次调用的中位数（计时期间暂停垃圾回收）；
+峰值内存在单独一次运行中由 tracemalloc 统计（NumPy 数组分配也会计入），避免跟踪开销影响计时。
+所有用例使用固定种子和固定对阵，结果只与代码和运行环境有关；运行环境与基线不同时不做比较，
+吞吐量退化的用例重新计时确认后才报告。
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from football_predictor import FootballPoissonPredictor
+from variance_reduction import SAMPLING_METHODS
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+SIMULATION_COUNTS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+QUICK_SIMULATION_COUNTS = [1_000, 10_000, 100_000]
+
+# 流式模拟的分块大小
+CHUNK_SIZES = [10_000, 50_000, 200_000]
+
+# 批量预测（predict_fixtures）每次调用的对阵数，以及蒙特卡洛方式下每场的模拟次数
+BATCH_SIZES = [100, 1_000, 10_000]
+BATCH_SIMULATIONS = 1_000
+
+# 每个用例累计计时的最短时间（秒）
+MIN_CASE_SECONDS = 0.2
+
+# 吞吐量下降或峰值内存上升超过该比例时视为退化
+REGRESSION_THRESHOLD = 0.25
+
+# 基线单次耗时低于 SHORT_CASE_SECONDS 的用例计时噪声较大，吞吐量使用更宽松的阈值
+SHORT_CASE_SECONDS = 0.01
+SHORT_CASE_THRESHOLD = 0.5
+
+# 吞吐量退化的用例重新计时的轮数，取各轮中较快的结果，排除机器瞬时抖动
+RECHECK_ROUNDS = 2
+
+BENCHMARK_SEED = 2024
+BENCHMARK_LEAGUE = '英超'
+BENCHMARK_HOME_XG = 1.65
+BENCHMARK_AWAY_XG = 1.25
+
+
+def measure(func, repeat, min_seconds=MIN_CASE_SECONDS):
+    """返回 (单次耗时中位数秒数, 峰值内存字节数)；至少运行 repeat 次且累计至少 min_seconds 秒"""
+    func()
+    timings = []
+    # 与 timeit 相同，计时期间暂停垃圾回收，避免回收时机不同带来的抖动
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(timings) < repeat or sum(timings) < min_seconds:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def build_fixtures(predictor, count, seed=BENCHMARK_SEED):
+    """从所有联赛中随机抽取 count 场主客不同的对阵（固定种子）"""
+    rng = np.random.default_rng(seed)
+    leagues = predictor.store.league_names()
+    fixtures = []
+    for league in rng.choice(leagues, count):
+        teams = predictor.get_teams_by_league(league)
+        home, away = rng.choice(len(teams), 2, replace=False)
+        fixtures.append((str(league), teams[home], teams[away]))
+    return fixtures
+
+
+def build_cases(predictor, simulation_counts, chunk_sizes, batch_sizes=BATCH_SIZES):
+    """逐个产出 (用例名, 参数字典, 模拟次数, setup)
+
+    setup() 返回被计时的可调用对象；汇总用例的输入样本在 setup 中才生成，被过滤掉的用例不会占用内存。
+    """
+    home_xG, away_xG, league = BENCHMARK_HOME_XG, BENCHMARK_AWAY_XG, BENCHMARK_LEAGUE
+
+    def draw(distribution, n):
+        if distribution == 'poisson':
+            return predictor.monte_carlo_simulation(home_xG, away_xG, n, BENCHMARK_SEED)
+        return predictor.monte_carlo_simulation_negative_binomial(home_xG, away_xG, league, n, BENCHMARK_SEED)
+
+    for n in simulation_counts:
+        for distribution in ('poisson', 'negative_binomial'):
+            yield (f'{distribution}_simulation', {'simulations': n}, n,
+                   lambda n=n, distribution=distribution: lambda: draw(distribution, n))
+
+            def aggregation(n=n, distribution=distribution):
+                samples = draw(distribution, n)
+                return lambda: predictor.calculate_probabilities_from_simulation(samples.home_goals, samples.away_goals, None, n)
+
+            yield ('aggregation', {'simulations': n, 'distribution': distribution}, n, aggregation)
+
+            for chunk_size in chunk_sizes:
+                yield ('streaming_simulation', {'simulations': n, 'distribution': distribution, 'chunk_size': chunk_size}, n,
+                       lambda n=n, distribution=distribution, chunk_size=chunk_size: lambda: predictor.monte_carlo_simulation_streaming(
+                           home_xG, away_xG, league, distribution, n, BENCHMARK_SEED, chunk_size=chunk_size))
+
+            for sampling in SAMPLING_METHODS:
+                if sampling != 'random':
+                    yield ('variance_reduced_simulation', {'simulations': n, 'distribution': distribution, 'sampling': sampling}, n,
+                           lambda n=n, distribution=distribution, sampling=sampling: lambda: predictor.monte_carlo_simulation_variance_reduced(
+                               home_xG, away_xG, league, distribution, n, sampling, BENCHMARK_SEED))
+
+    def result_tables():
+        # 结果表格与图表构建只依赖汇总后的概率，规模与模拟次数无关
+        from appp import build_goal_chart, build_goal_tables
+        probs = predictor.calculate_probabilities_from_simulation(*draw('poisson', 10_000), 10_000)
+
+        def render():
+            chart_data, _ = build_goal_tables(probs, 10_000)
+            chart = build_goal_chart(chart_data, "泊松分布")
+            if chart is not None:
+                chart.to_dict()
+        return render
+
+    yield ('result_tables', {}, 1, result_tables)
+
+    # 批量预测：吞吐量按对阵数计
+    for batch_size in batch_sizes:
+        for method in ('exact', 'monte_carlo'):
+            def batch_prediction(batch_size=batch_size, method=method):
+                fixtures = build_fixtures(predictor, batch_size)
+                return lambda: predictor.predict_fixtures(fixtures, 'poisson', method, BATCH_SIMULATIONS, seed=BENCHMARK_SEED)
+
+            yield ('batch_prediction', {'fixtures': batch_size, 'method': method}, batch_size, batch_prediction)
+
+    def sensitivity_grid():
+        # 41 × 41 个预期进球缩放 × 11 个过离散参数，吞吐量按网格点数计
+        scales = np.linspace(0.8, 1.2, 41)
+        return lambda: predictor.sensitivity_grid(home_xG, away_xG, scales, scales, np.linspace(1.0, 2.0, 11))
+
+    yield ('sensitivity_grid', {'points': 41 * 41 * 11}, 41 * 41 * 11, sensitivity_grid)
+
+
+def case_key(name, params):
+    """用例的唯一标识，例如 streaming_simulation[chunk_size=50000,distribution=poisson,simulations=1000]"""
+    return f"{name}[{','.join(f'{k}={v}' for k, v in sorted(params.items()))}]"
+
+
+def run_benchmarks(simulation_counts=SIMULATION_COUNTS, chunk_sizes=CHUNK_SIZES, repeat=3, name_filter=None, stream=None,
+                   batch_sizes=BATCH_SIZES, keys=None):
+    """运行全部用例（指定 keys 时只运行这些标识的用例），返回 {用例标识: 结果字典}"""
+    predictor = FootballPoissonPredictor(seed=BENCHMARK_SEED)
+    results = {}
+    for name, params, simulations, setup in build_cases(predictor, simulation_counts, chunk_sizes, batch_sizes):
+        key = case_key(name, params)
+        if (name_filter and name_filter not in key) or (keys is not None and key not in keys):
+            continue
+        seconds, peak = measure(setup(), repeat)
+        results[key] = {
+            'name': name,
+            'params': params,
+            'seconds': seconds,
+            'throughput': simulations / seconds,
+            'peak_bytes': peak
+        }
+        if stream is not None:
+            stream.write(f"{key:<90} {seconds * 1000:>10.2f} ms {simulations / seconds:>14,.0f}/s {peak / 2**20:>9.2f} MiB\n")
+            stream.flush()
+    return results
+
+
+def environment():
+    """记录运行环境，便于判断基线是否可比"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare_with_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """与基线比较，返回退化列表 [(用例标识, 指标, 基线值, 当前值)]"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        throughput_threshold = max(threshold, SHORT_CASE_THRESHOLD) if reference['seconds'] < SHORT_CASE_SECONDS else threshold
+        if result['throughput'] < reference['throughput'] * (1 - throughput_threshold):
+            regressions.append((key, 'throughput', reference['throughput'], result['throughput']))
+        if result['peak_bytes'] > reference['peak_bytes'] * (1 + threshold):
+            regressions.append((key, 'peak_bytes', reference['peak_bytes'], result['peak_bytes']))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="足球预测模型基准测试")
+    parser.add_argument('--quick', action='store_true', help="只运行 1k~100k 次模拟的用例")
+    parser.add_argument('--repeat', type=int, default=3, help="最少计时次数（取中位数）")
+    parser.add_argument('--filter', help="只运行标识中包含该字符串的用例")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="基线 JSON 文件路径")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果写入基线文件")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help="判定退化的相对变化比例")
+    parser.add_argument('-o', '--output', help="另外把本次结果写入该 JSON 文件")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = QUICK_SIMULATION_COUNTS if args.quick else SIMULATION_COUNTS
+    results = run_benchmarks(counts, CHUNK_SIZES, args.repeat, args.filter, sys.stdout)
+    report = {'environment': environment(), 'results': results}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        # 合并到已有基线，只覆盖本次运行过的用例
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline_report = json.load(f)
+            baseline_report['results'].update(results)
+            baseline_report['environment'] = report['environment']
+        else:
+            baseline_report = report
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline_report, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"未找到基线文件 {args.baseline}，使用 --save-baseline 生成")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline_report = json.load(f)
+    if baseline_report.get('environment') != report['environment']:
+        print("基线的运行环境与当前不同，跳过比较；在当前环境使用 --save-baseline 重新生成基线")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline_report['results'], args.threshold)
+    for _ in range(RECHECK_ROUNDS):
+        slow = {key for key, metric, _, _ in regressions if metric == 'throughput'}
+        if not slow:
+            break
+        print(f"重新计时吞吐量退化的用例: {len(slow)} 个")
+        for key, result in run_benchmarks(counts, CHUNK_SIZES, args.repeat, keys=slow).items():
+            if result['throughput'] > results[key]['throughput']:
+                results[key] = result
+        regressions = compare_with_baseline(results, baseline_report['results'], args.threshold)
+    for key, metric, reference, current in regressions:
+        print(f"退化 {key} {metric}: 基线 {reference:,.0f} → 当前 {current:,.0f}")
+    if regressions:
+        return 1
+    print("未发现性能退化")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
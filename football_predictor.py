@@ -0,0 +1,756 @@
+"""足球比赛进球预测核心模型（不依赖 Streamlit，可在批处理任务中直接导入）"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import count, timed
+from match_summary import GoalSamples, MatchSummary
+from random_streams import BIT_GENERATORS, make_generator
+from season_simulator import simulate_season
+from team_store import TeamDataStore
+from variance_reduction import SAMPLING_METHODS, importance_proposal, invert_score_matrix, uniform_points
+
+# 解析计算时比分矩阵的截断进球数（最后一档累计尾部概率）
+MAX_GOALS = 15
+
+# 批量模拟时单个分块允许的最大抽样数（场次 × 模拟次数）
+BATCH_SAMPLE_BUDGET = 4_000_000
+
+# 模拟结果缓存的默认容量
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ENTRIES = 1024
+
+# 流式模拟每块抽样数，以及自适应模式下的抽样上限
+STREAM_CHUNK_SIZE = 50_000
+STREAM_MAX_SIMULATIONS = 100_000_000
+
+# 方差缩减模拟的独立随机化块数（用块间方差估计标准误），自适应模式下每 VARIANCE_REDUCTION_BLOCKS 块检查一次精度
+VARIANCE_REDUCTION_BLOCKS = 16
+
+# 方差缩减模式下报告标准误和等效样本量的市场（含 7+ 球、净胜 3 球以上两个尾部市场）
+ERROR_MARKETS = ('home_win', 'draw', 'away_win', 'prob_gt_2_5', 'prob_7_plus', 'margin_3_plus')
+
+# 敏感性分析网格报告的市场
+SENSITIVITY_MARKETS = ('home_win', 'draw', 'away_win', 'prob_gt_2_5', 'prob_gt_3_5', 'both_teams_score', 'prob_7_plus',
+                       'margin_3_plus')
+
+# Dixon-Coles 低比分修正参数 ρ 的默认值（负值提高 0-0、1-1 的概率）
+DIXON_COLES_RHO = -0.13
+
+# 双变量泊松共同进球分量 λ3（即主客队进球的协方差）的默认值，以及它占较小一方预期进球的上限
+BIVARIATE_COVARIANCE = 0.1
+BIVARIATE_MAX_SHARE = 0.95
+
+
+def get_nbinom_params(mean, overdispersion):
+    """由均值和过离散参数计算负二项分布参数 (n, p)"""
+    variance = mean * overdispersion
+    p = mean / variance
+    n = mean * p / (1 - p)
+    return n, p
+
+
+def poisson_pmf(mean, max_goals=MAX_GOALS):
+    """截断泊松分布概率，支持数组广播"""
+    mean = np.asarray(mean, dtype=float)[..., None]
+    k = np.arange(1, max_goals + 1)
+    # P(k) = P(k-1) * λ / k
+    pmf = np.concatenate([np.ones(mean.shape), np.cumprod(mean / k, axis=-1)], axis=-1) * np.exp(-mean)
+    return _fold_tail(pmf)
+
+
+def nbinom_pmf(n, p, max_goals=MAX_GOALS):
+    """截断负二项分布概率，支持数组广播"""
+    n = np.asarray(n, dtype=float)[..., None]
+    p = np.asarray(p, dtype=float)[..., None]
+    k = np.arange(1, max_goals + 1)
+    # P(k) = P(k-1) * (k - 1 + n) / k * (1 - p)
+    pmf = np.concatenate([np.ones(np.broadcast(n, p).shape), np.cumprod((k - 1 + n) / k * (1 - p), axis=-1)], axis=-1) * p ** n
+    return _fold_tail(pmf)
+
+
+def goal_pmf(mean, overdispersion, max_goals=MAX_GOALS):
+    """过离散参数 > 1 时为负二项分布，否则为泊松分布的截断进球概率，均值和过离散参数均支持数组广播"""
+    mean, overdispersion = np.broadcast_arrays(np.asarray(mean, dtype=float), np.asarray(overdispersion, dtype=float))
+    negative_binomial = overdispersion > 1
+    # 泊松点用占位值 2 计算负二项参数以避免除零，结果随后被泊松分布替换
+    n, p = get_nbinom_params(mean, np.where(negative_binomial, overdispersion, 2.0))
+    return np.where(negative_binomial[..., None], nbinom_pmf(n, p, max_goals), poisson_pmf(mean, max_goals))
+
+
+def _fold_tail(pmf):
+    """把截断点之后的尾部概率并入最后一档"""
+    pmf[..., -1] = np.clip(1 - pmf[..., :-1].sum(axis=-1), 0, None)
+    return pmf
+
+
+def dixon_coles_score_matrix(home_xG, away_xG, rho=DIXON_COLES_RHO, max_goals=MAX_GOALS):
+    """Dixon-Coles 比分矩阵：独立泊松外积后对 0-0、0-1、1-0、1-1 乘以修正因子 τ，支持数组广播"""
+    home_xG = np.asarray(home_xG, dtype=float)
+    away_xG = np.asarray(away_xG, dtype=float)
+    matrix = poisson_pmf(home_xG, max_goals)[..., :, None] * poisson_pmf(away_xG, max_goals)[..., None, :]
+    matrix[..., 0, 0] *= 1 - home_xG * away_xG * rho
+    matrix[..., 0, 1] *= 1 + home_xG * rho
+    matrix[..., 1, 0] *= 1 + away_xG * rho
+    matrix[..., 1, 1] *= 1 - rho
+    # ρ 超出有效范围时修正因子可能为负，截断后重新归一化
+    np.clip(matrix, 0, None, out=matrix)
+    return matrix / matrix.sum(axis=(-2, -1), keepdims=True)
+
+
+def bivariate_poisson_components(home_xG, away_xG, covariance=BIVARIATE_COVARIANCE):
+    """拆分双变量泊松的三个独立分量 (λ1, λ2, λ3)：主队进球 = X1 + X3，客队进球 = X2 + X3"""
+    home_xG = np.asarray(home_xG, dtype=float)
+    away_xG = np.asarray(away_xG, dtype=float)
+    shared = np.minimum(covariance, BIVARIATE_MAX_SHARE * np.minimum(home_xG, away_xG))
+    return home_xG - shared, away_xG - shared, shared
+
+
+def bivariate_poisson_score_matrix(home_xG, away_xG, covariance=BIVARIATE_COVARIANCE, max_goals=MAX_GOALS):
+    """双变量泊松比分矩阵 P(x, y) = Σk P1(x-k)·P2(y-k)·P3(k)，支持数组广播"""
+    home_only, away_only, shared = bivariate_poisson_components(home_xG, away_xG, covariance)
+    goals = np.arange(max_goals + 1)
+    # shift[k, x] = x - k，负值位置概率为 0
+    shift = goals[None, :] - goals[:, None]
+    
+    def shifted(pmf):
+        return np.where(shift >= 0, np.take(pmf, np.clip(shift, 0, None), axis=-1), 0)
+    
+    matrix = np.einsum('...k,...kx,...ky->...xy', poisson_pmf(shared, max_goals),
+                       shifted(poisson_pmf(home_only, max_goals)), shifted(poisson_pmf(away_only, max_goals)))
+    return matrix / matrix.sum(axis=(-2, -1), keepdims=True)
+
+
+def sample_from_score_matrices(score_matrices, num_simulations, rng):
+    """按比分概率矩阵 (场次, 主队进球, 客队进球) 逆变换抽样，返回两个 (场次, 模拟次数) 的进球数组"""
+    num_fixtures, rows, cols = score_matrices.shape
+    cdf = np.cumsum(score_matrices.reshape(num_fixtures, -1), axis=1)
+    cdf /= cdf[:, -1:]
+    # 第 i 场的累计分布平移到 (i, i+1]，一次 searchsorted 完成所有场次
+    offsets = np.arange(num_fixtures)[:, None]
+    flat = np.searchsorted((cdf + offsets).ravel(), (rng.random((num_fixtures, num_simulations)) + offsets).ravel(), side='right')
+    flat = np.minimum(flat.reshape(num_fixtures, num_simulations) - offsets * rows * cols, rows * cols - 1)
+    return flat // cols, flat % cols
+
+
+# summarize_score_matrices 返回的市场字段
+SUMMARY_COLUMNS = ('home_win', 'draw', 'away_win', 'prob_0_1', 'prob_2_3', 'prob_4_6', 'prob_7_plus', 'prob_gt_2_5',
+                   'prob_gt_3_5', 'most_likely_score', 'most_likely_score_prob')
+
+
+def summarize_score_matrices(score_matrices):
+    """从一批比分矩阵 (场次, 主队进球, 客队进球) 向量化计算主要市场概率"""
+    score_matrices = np.asarray(score_matrices, dtype=float)
+    _, rows, cols = score_matrices.shape
+    home_goals = np.arange(rows)[:, None]
+    away_goals = np.arange(cols)[None, :]
+    total_goals = home_goals + away_goals
+    
+    def market(mask):
+        return (score_matrices * mask).sum(axis=(1, 2))
+    
+    best = score_matrices.reshape(len(score_matrices), -1).argmax(axis=1)
+    return {
+        'home_win': market(home_goals > away_goals),
+        'draw': market(home_goals == away_goals),
+        'away_win': market(home_goals < away_goals),
+        'prob_0_1': market(total_goals <= 1),
+        'prob_2_3': market((total_goals >= 2) & (total_goals <= 3)),
+        'prob_4_6': market((total_goals >= 4) & (total_goals <= 6)),
+        'prob_7_plus': market(total_goals >= 7),
+        'prob_gt_2_5': market(total_goals > 2.5),
+        'prob_gt_3_5': market(total_goals > 3.5),
+        'most_likely_score': [f"{i // cols}-{i % cols}" for i in best],
+        'most_likely_score_prob': score_matrices.reshape(len(score_matrices), -1).max(axis=1)
+    }
+
+
+def market_probability_grid(score_matrices):
+    """任意前导维度的比分矩阵 (..., 主队进球, 客队进球) 在 SENSITIVITY_MARKETS 上的概率，一次 einsum 完成"""
+    score_matrices = np.asarray(score_matrices, dtype=float)
+    rows, cols = score_matrices.shape[-2:]
+    home_goals = np.arange(rows)[:, None]
+    away_goals = np.arange(cols)[None, :]
+    total_goals = home_goals + away_goals
+    masks = np.stack(np.broadcast_arrays(
+        home_goals > away_goals, home_goals == away_goals, home_goals < away_goals,
+        total_goals > 2.5, total_goals > 3.5, (home_goals > 0) & (away_goals > 0), total_goals >= 7,
+        np.abs(home_goals - away_goals) >= 3
+    )).astype(float)
+    return dict(zip(SENSITIVITY_MARKETS, np.einsum('...xy,mxy->m...', score_matrices, masks)))
+
+
+def error_market_probabilities(score_matrices):
+    """一批比分矩阵在 ERROR_MARKETS 上的概率，返回 (场次, 市场数)"""
+    score_matrices = np.asarray(score_matrices, dtype=float)
+    _, rows, cols = score_matrices.shape
+    markets = summarize_score_matrices(score_matrices)
+    margin = np.abs(np.subtract.outer(np.arange(rows), np.arange(cols))) >= 3
+    markets['margin_3_plus'] = (score_matrices * margin).sum(axis=(1, 2))
+    return np.stack([markets[name] for name in ERROR_MARKETS], axis=1)
+
+
+def block_standard_error(block_markets, block_sizes):
+    """由独立块的市场估计 (块数, 市场数) 计算合并估计的标准误
+    
+    返回 (最大标准误, {市场: 等效样本量})。等效样本量 = p(1 - p) / 标准误²，
+    即普通蒙特卡洛达到同样标准误需要的抽样次数。
+    """
+    block_markets = np.asarray(block_markets, dtype=float)
+    weights = np.asarray(block_sizes, dtype=float) / np.sum(block_sizes)
+    num_blocks = len(weights)
+    mean = weights @ block_markets
+    variance = num_blocks / max(num_blocks - 1, 1) * (weights ** 2) @ (block_markets - mean) ** 2
+    binomial = np.clip(mean, 0, 1) * (1 - np.clip(mean, 0, 1))
+    ess = np.divide(binomial, variance, out=np.full_like(mean, np.inf), where=variance > 0)
+    return float(np.sqrt(variance).max()), dict(zip(ERROR_MARKETS, ess.tolist()))
+
+
+class SimulationCache:
+    """线程安全的 LRU 缓存，按条目数和估算内存占用淘汰最久未使用的结果"""
+    
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_entries=CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key):
+        """命中时返回缓存结果并标记为最近使用，否则返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value):
+        """写入结果，超出容量时从最久未使用的条目开始淘汰"""
+        size = _estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self._entries and (self.nbytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+def _estimate_nbytes(value):
+    """估算结果字典的内存占用（数组按实际字节数计）"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class FootballPoissonPredictor:
+    def __init__(self, cache=None, seed=None, bit_generator='PCG64', store=None):
+        # 模拟结果缓存，键为 (联赛, 主队, 客队, 分布, 模拟次数, 随机种子, 自适应标准误, 位生成器, 相关参数, 强度来源)
+        self.cache = cache if cache is not None else SimulationCache()
+        
+        # 预测器自有的随机流（未指定种子的模拟使用），不依赖 numpy 全局状态
+        self.bit_generator = bit_generator
+        self.reseed(seed, bit_generator)
+        
+        # 按联赛缓存的球队强度数组，见 get_league_strengths
+        self._strength_cache = {}
+        
+        # 联赛与球队数据：列式 .npy 文件，按联赛懒加载（见 team_store）
+        self.store = store if store is not None else TeamDataStore()
+        self.league_data = self.store.league_data
+        self.team_data = self.store.team_data
+
+    def reseed(self, seed=None, bit_generator=None):
+        """重置预测器的随机流，可同时切换位生成器（PCG64 或 Philox）"""
+        if bit_generator is not None:
+            if bit_generator not in BIT_GENERATORS:
+                raise ValueError(f"不支持的随机数生成器: {bit_generator}")
+            self.bit_generator = bit_generator
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = make_generator(self.seed_sequence, self.bit_generator)
+
+    def spawn_seeds(self, n):
+        """派生 n 个独立的子 SeedSequence，用于工作进程"""
+        return self.seed_sequence.spawn(n)
+
+    def spawn_generators(self, n):
+        """派生 n 个独立的子 Generator，用于线程（Generator 本身不是线程安全的）"""
+        return [make_generator(child, self.bit_generator) for child in self.spawn_seeds(n)]
+
+    def _get_rng(self, seed=None):
+        """指定种子时返回新的可复现 Generator，否则返回预测器自有的随机流"""
+        if seed is None:
+            return self.rng
+        return make_generator(seed, self.bit_generator)
+
+    def get_teams_by_league(self, league):
+        """获取指定联赛的所有球队"""
+        if league in self._strength_cache:
+            return list(self._strength_cache[league]['teams'])
+        if self.store.has_league(league):
+            return self.store.get_league(league).teams.tolist()
+        return []
+    
+    @timed()
+    def calculate_expected_goals(self, home_team, away_team, league):
+        """计算预期进球数"""
+        strengths = self.get_league_strengths(league)
+        home_index = strengths['index'].get(home_team)
+        away_index = strengths['index'].get(away_team)
+        if home_index is None or away_index is None:
+            missing = [team for team, index in ((home_team, home_index), (away_team, away_index)) if index is None]
+            raise ValueError(f"球队数据不存在: {', '.join(missing)}，请检查球队名称是否正确")
+        
+        # 计算预期进球
+        league_rates = strengths['rates']
+        home_xG = strengths['home_attack'][home_index] * strengths['away_defense'][away_index] * league_rates['home_goal_rate']
+        away_xG = strengths['away_attack'][away_index] * strengths['home_defense'][home_index] * league_rates['away_goal_rate']
+        
+        return float(home_xG), float(away_xG)
+
+    def has_league(self, league):
+        """联赛是否可用：球队数据中的联赛，或只出现在历史赛果拟合中的联赛"""
+        return league in self._strength_cache or self.store.has_league(league)
+
+    def get_league_strengths(self, league):
+        """获取联赛全部球队的进攻/防守强度数组（每个联赛只构建一次，可被历史赛果拟合结果替换）"""
+        if league not in self._strength_cache:
+            if not self.store.has_league(league):
+                raise ValueError(f"不支持该联赛: {league}")
+            
+            table = self.store.get_league(league)
+            league_rates = table.rates
+            
+            # 计算进攻强度和防守强度
+            self._strength_cache[league] = {
+                'teams': table.teams.tolist(),
+                'index': table.index,
+                'rates': league_rates,
+                'home_attack': table.column('home_goals') / league_rates['home_goal_rate'],
+                'home_defense': table.column('home_conceded') / league_rates['away_goal_rate'],
+                'away_attack': table.column('away_goals') / league_rates['away_goal_rate'],
+                'away_defense': table.column('away_conceded') / league_rates['home_goal_rate'],
+                'source': 'store'
+            }
+        return self._strength_cache[league]
+
+    def use_fitted_strengths(self, fitter, leagues=None):
+        """改用 StrengthFitter 根据历史赛果拟合的攻防强度（过离散参数仍取联赛数据）"""
+        for league in leagues if leagues is not None else fitter.leagues():
+            rates = {'overdispersion': self.get_overdispersion(league)}
+            self._strength_cache[league] = fitter.strengths(league, rates)
+
+    def reset_strengths(self):
+        """恢复使用球队数据中的统计强度"""
+        self._strength_cache.clear()
+
+    def calculate_expected_goals_batch(self, league, home_teams, away_teams):
+        """批量计算同一联赛多场对阵的预期进球数"""
+        strengths = self.get_league_strengths(league)
+        try:
+            home_index = np.array([strengths['index'][team] for team in home_teams], dtype=np.intp)
+            away_index = np.array([strengths['index'][team] for team in away_teams], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"球队数据不存在: {e.args[0]}，请检查球队名称是否正确") from None
+        
+        league_rates = strengths['rates']
+        home_xG = strengths['home_attack'][home_index] * strengths['away_defense'][away_index] * league_rates['home_goal_rate']
+        away_xG = strengths['away_attack'][away_index] * strengths['home_defense'][home_index] * league_rates['away_goal_rate']
+        return home_xG, away_xG
+
+    def calculate_expected_goals_matrix(self, league):
+        """计算联赛 N×N 全部主客对阵的预期进球矩阵（行为主队，列为客队）"""
+        strengths = self.get_league_strengths(league)
+        league_rates = strengths['rates']
+        home_xG = np.outer(strengths['home_attack'], strengths['away_defense']) * league_rates['home_goal_rate']
+        away_xG = np.outer(strengths['home_defense'], strengths['away_attack']) * league_rates['away_goal_rate']
+        return strengths['teams'], home_xG, away_xG
+
+    @timed()
+    def simulate_season(self, league, num_seasons=10000, distribution='poisson', played=None, workers=None, seed=None):
+        """模拟联赛剩余双循环赛程，返回 (球队汇总表, 名次概率矩阵, 积分概率矩阵)"""
+        teams, home_xG, away_xG = self.calculate_expected_goals_matrix(league)
+        if seed is None:
+            seed = self.spawn_seeds(1)[0]
+        return simulate_season(
+            teams, home_xG, away_xG, num_seasons, distribution, self.get_overdispersion(league),
+            played, workers=workers, seed=seed, bit_generator=self.bit_generator
+        )
+
+    @timed()
+    def monte_carlo_simulation(self, home_xG, away_xG, num_simulations=10000, seed=None):
+        """泊松分布蒙特卡洛模拟，返回 GoalSamples（int8 样本，可按 主队, 客队, 总进球 解包）"""
+        rng = self._get_rng(seed)
+        return GoalSamples(rng.poisson(home_xG, num_simulations), rng.poisson(away_xG, num_simulations))
+
+    @timed()
+    def monte_carlo_simulation_negative_binomial(self, home_xG, away_xG, league, num_simulations=10000, seed=None):
+        """负二项分布蒙特卡洛模拟（按联赛调整）"""
+        # 添加防御性编程，确保联赛存在
+        if not self.has_league(league):
+            raise ValueError(f"联赛 '{league}' 不在支持的联赛列表中")
+            
+        overdispersion = self.get_overdispersion(league)
+        
+        # 计算负二项分布参数
+        n_home, p_home = get_nbinom_params(home_xG, overdispersion)
+        n_away, p_away = get_nbinom_params(away_xG, overdispersion)
+        
+        # 模拟进球数
+        rng = self._get_rng(seed)
+        return GoalSamples(rng.negative_binomial(n_home, p_home, num_simulations),
+                           rng.negative_binomial(n_away, p_away, num_simulations))
+
+    def get_overdispersion(self, league):
+        """获取联赛特定的过离散参数，如果不存在则使用默认值1.3"""
+        return self.league_data.get(league, {}).get('overdispersion', 1.3)
+
+    @timed()
+    def calculate_exact_score_matrix(self, home_xG, away_xG, league=None, distribution='poisson', max_goals=MAX_GOALS, overdispersion=None,
+                                     rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """解析计算比分概率矩阵（支持批量）
+        
+        泊松/负二项为主客队进球分布的外积；dixon_coles 使用低比分修正参数 rho，
+        bivariate_poisson 使用主客队进球的共同分量 covariance。
+        """
+        if distribution == 'dixon_coles':
+            return dixon_coles_score_matrix(home_xG, away_xG, rho, max_goals)
+        if distribution == 'bivariate_poisson':
+            return bivariate_poisson_score_matrix(home_xG, away_xG, covariance, max_goals)
+        
+        if distribution == 'poisson':
+            home_pmf = poisson_pmf(home_xG, max_goals)
+            away_pmf = poisson_pmf(away_xG, max_goals)
+        elif distribution == 'negative_binomial':
+            if overdispersion is None:
+                if not self.has_league(league):
+                    raise ValueError(f"联赛 '{league}' 不在支持的联赛列表中")
+                overdispersion = self.get_overdispersion(league)
+            home_pmf = nbinom_pmf(*get_nbinom_params(home_xG, overdispersion), max_goals)
+            away_pmf = nbinom_pmf(*get_nbinom_params(away_xG, overdispersion), max_goals)
+        else:
+            raise ValueError(f"不支持的分布类型: {distribution}")
+        return home_pmf[..., :, None] * away_pmf[..., None, :]
+
+    @timed()
+    def sensitivity_grid(self, home_xG, away_xG, home_scales, away_scales, overdispersions, max_goals=MAX_GOALS):
+        """预期进球缩放 × 过离散参数的敏感性网格，一次广播计算全部 (过离散参数, 主队缩放, 客队缩放) 的比分矩阵
+        
+        过离散参数 ≤ 1 的点按泊松分布计算。返回各坐标轴和 {市场: (过离散参数数, 主队缩放数, 客队缩放数) 概率数组}。
+        """
+        home_scales = np.asarray(home_scales, dtype=float)
+        away_scales = np.asarray(away_scales, dtype=float)
+        overdispersions = np.asarray(overdispersions, dtype=float)
+        dispersion = overdispersions[:, None, None]
+        home_pmf = goal_pmf(home_xG * home_scales[None, :, None], dispersion, max_goals)
+        away_pmf = goal_pmf(away_xG * away_scales[None, None, :], dispersion, max_goals)
+        score_matrices = home_pmf[..., :, None] * away_pmf[..., None, :]
+        return {
+            'home_xG': home_xG * home_scales,
+            'away_xG': away_xG * away_scales,
+            'home_scales': home_scales,
+            'away_scales': away_scales,
+            'overdispersions': overdispersions,
+            'markets': market_probability_grid(score_matrices)
+        }
+
+    @timed()
+    def calculate_exact_probabilities(self, home_xG, away_xG, league=None, distribution='poisson', max_goals=MAX_GOALS, top_n=5,
+                                      rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """解析计算概率（无抽样噪声，返回与模拟路径相同的 MatchSummary）"""
+        score_matrix = self.calculate_exact_score_matrix(
+            home_xG, away_xG, league, distribution, max_goals, rho=rho, covariance=covariance
+        )
+        return self.calculate_probabilities_from_matrix(score_matrix, top_n)
+
+    @timed()
+    def simulate_score_matrices(self, home_xG, away_xG, distribution='poisson', overdispersion=None, num_simulations=10000, max_goals=MAX_GOALS, seed=None,
+                                rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """批量蒙特卡洛模拟，返回每场比赛的比分频率矩阵（超过 max_goals 的进球并入最后一档）"""
+        home_xG = np.asarray(home_xG, dtype=float)
+        away_xG = np.asarray(away_xG, dtype=float)
+        num_fixtures = len(home_xG)
+        size = max_goals + 1
+        counts = np.zeros((num_fixtures, size * size))
+        
+        if distribution == 'negative_binomial':
+            n_home, p_home = get_nbinom_params(home_xG, overdispersion)
+            n_away, p_away = get_nbinom_params(away_xG, overdispersion)
+        elif distribution == 'bivariate_poisson':
+            home_only, away_only, shared = bivariate_poisson_components(home_xG, away_xG, covariance)
+        elif distribution not in ('poisson', 'dixon_coles'):
+            raise ValueError(f"不支持的分布类型: {distribution}")
+        
+        # 按场次分块，控制单块抽样数组的内存
+        rng = self._get_rng(seed)
+        chunk = max(1, BATCH_SAMPLE_BUDGET // num_simulations)
+        for start in range(0, num_fixtures, chunk):
+            block = slice(start, start + chunk)
+            shape = (len(home_xG[block]), num_simulations)
+            if distribution == 'poisson':
+                home_goals = rng.poisson(home_xG[block, None], shape)
+                away_goals = rng.poisson(away_xG[block, None], shape)
+            elif distribution == 'negative_binomial':
+                home_goals = rng.negative_binomial(n_home[block, None], p_home[block, None], shape)
+                away_goals = rng.negative_binomial(n_away[block, None], p_away[block, None], shape)
+            elif distribution == 'bivariate_poisson':
+                shared_goals = rng.poisson(shared[block, None], shape)
+                home_goals = rng.poisson(home_only[block, None], shape) + shared_goals
+                away_goals = rng.poisson(away_only[block, None], shape) + shared_goals
+            else:
+                home_goals, away_goals = sample_from_score_matrices(
+                    dixon_coles_score_matrix(home_xG[block], away_xG[block], rho, max_goals), num_simulations, rng
+                )
+            
+            np.minimum(home_goals, max_goals, out=home_goals)
+            np.minimum(away_goals, max_goals, out=away_goals)
+            flat_index = np.arange(shape[0])[:, None] * size * size + home_goals * size + away_goals
+            counts[block] = np.bincount(flat_index.ravel(), minlength=shape[0] * size * size).reshape(shape[0], -1)
+        
+        return counts.reshape(num_fixtures, size, size) / num_simulations
+
+    @timed()
+    def predict_fixtures(self, fixtures, distribution='poisson', method='exact', num_simulations=10000, max_goals=MAX_GOALS, seed=None,
+                         rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """批量预测对阵列表 [(联赛, 主队, 客队), ...]，返回每场一行的 DataFrame"""
+        columns = ['league', 'home_team', 'away_team']
+        if isinstance(fixtures, pd.DataFrame):
+            fixtures = fixtures[columns].reset_index(drop=True)
+        else:
+            fixtures = pd.DataFrame(list(fixtures), columns=columns)
+        
+        home_xG = np.empty(len(fixtures))
+        away_xG = np.empty(len(fixtures))
+        for league, index in fixtures.groupby('league').indices.items():
+            home_xG[index], away_xG[index] = self.calculate_expected_goals_batch(
+                league, fixtures['home_team'].to_numpy()[index], fixtures['away_team'].to_numpy()[index]
+            )
+        
+        return self._predict_from_expected_goals(
+            fixtures, home_xG, away_xG, distribution, method, num_simulations, max_goals, seed, rho, covariance
+        )
+
+    def predict_league_matrix(self, league, distribution='poisson', method='exact', num_simulations=10000, max_goals=MAX_GOALS, seed=None,
+                              rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """批量预测联赛全部 N×(N-1) 场主客对阵"""
+        teams, home_xG, away_xG = self.calculate_expected_goals_matrix(league)
+        home_index, away_index = np.nonzero(~np.eye(len(teams), dtype=bool))
+        teams = np.array(teams, dtype=object)
+        fixtures = pd.DataFrame({
+            'league': league,
+            'home_team': teams[home_index],
+            'away_team': teams[away_index]
+        })
+        return self._predict_from_expected_goals(
+            fixtures, home_xG[home_index, away_index], away_xG[home_index, away_index],
+            distribution, method, num_simulations, max_goals, seed, rho, covariance
+        )
+
+    def _predict_from_expected_goals(self, fixtures, home_xG, away_xG, distribution, method, num_simulations, max_goals, seed=None,
+                                     rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """由批量预期进球计算比分矩阵并汇总为 DataFrame"""
+        leagues = fixtures['league']
+        overdispersion = leagues.map({league: self.get_overdispersion(league) for league in leagues.unique()}).to_numpy(dtype=float)
+        if method == 'exact':
+            score_matrices = self.calculate_exact_score_matrix(
+                home_xG, away_xG, distribution=distribution, max_goals=max_goals, overdispersion=overdispersion,
+                rho=rho, covariance=covariance
+            )
+        elif method == 'monte_carlo':
+            score_matrices = self.simulate_score_matrices(
+                home_xG, away_xG, distribution, overdispersion, num_simulations, max_goals, seed, rho, covariance
+            )
+        else:
+            raise ValueError(f"不支持的计算方式: {method}")
+        
+        # 一次性构建所有列，避免逐列插入的开销
+        return pd.DataFrame({
+            **{column: fixtures[column].to_numpy() for column in fixtures.columns},
+            'home_xG': home_xG,
+            'away_xG': away_xG,
+            **summarize_score_matrices(score_matrices)
+        })
+
+    @timed()
+    def calculate_probabilities_from_simulation(self, home_goals_sim, away_goals_sim, total_goals_sim, num_simulations, top_n=5):
+        """从模拟结果计算概率（单次 bincount 构建主客队联合比分直方图，total_goals_sim 不再使用，可传 None）"""
+        # 主队进球 × 客队进球 的二维计数矩阵，结果只保留 uint32 计数
+        score_counts = GoalSamples(home_goals_sim, away_goals_sim).score_counts()
+        return MatchSummary.from_counts(score_counts, num_simulations, top_n=top_n)
+
+    @timed()
+    def calculate_probabilities_from_matrix(self, score_matrix, top_n=5):
+        """从比分概率矩阵构建 MatchSummary（衍生概率在访问时由累计表查询）"""
+        return MatchSummary.from_matrix(score_matrix, top_n)
+
+    @timed()
+    def monte_carlo_simulation_streaming(self, home_xG, away_xG, league=None, distribution='poisson', num_simulations=10000,
+                                         seed=None, tolerance=None, chunk_size=STREAM_CHUNK_SIZE,
+                                         max_simulations=STREAM_MAX_SIMULATIONS, max_goals=MAX_GOALS,
+                                         rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """分块流式模拟，只累计比分直方图，内存占用与模拟次数无关
+        
+        指定 tolerance 时忽略 num_simulations，持续抽样直到关键市场的标准误低于 tolerance
+        （或达到 max_simulations）。返回 (比分计数矩阵, 实际模拟次数)。
+        """
+        if distribution == 'negative_binomial' and not self.has_league(league):
+            raise ValueError(f"联赛 '{league}' 不在支持的联赛列表中")
+        
+        rng = self._get_rng(seed)
+        size = max_goals + 1
+        score_counts = np.zeros(size * size, dtype=np.int64)
+        limit = max_simulations if tolerance is not None else num_simulations
+        drawn = 0
+        while drawn < limit:
+            chunk = min(chunk_size, limit - drawn)
+            home_goals, away_goals = self._draw_goals(rng, home_xG, away_xG, league, distribution, chunk, rho, covariance)
+            np.minimum(home_goals, max_goals, out=home_goals)
+            np.minimum(away_goals, max_goals, out=away_goals)
+            score_counts += np.bincount(home_goals * size + away_goals, minlength=size * size)
+            drawn += chunk
+            count('simulation_chunks')
+            
+            if tolerance is not None and self.calculate_standard_error(score_counts.reshape(size, size), drawn) < tolerance:
+                break
+        
+        count('simulations', drawn)
+        return score_counts.reshape(size, size), drawn
+
+    @timed()
+    def monte_carlo_simulation_variance_reduced(self, home_xG, away_xG, league=None, distribution='poisson', num_simulations=10000,
+                                                sampling='sobol', seed=None, tolerance=None, chunk_size=STREAM_CHUNK_SIZE,
+                                                max_simulations=STREAM_MAX_SIMULATIONS, max_goals=MAX_GOALS,
+                                                rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """方差缩减模拟：对比分矩阵做拟随机逆变换（antithetic / latin_hypercube / sobol）或重要性抽样（importance）
+        
+        抽样分成 VARIANCE_REDUCTION_BLOCKS 个独立随机化的块，标准误由块间方差估计；指定 tolerance 时
+        每块 chunk_size / VARIANCE_REDUCTION_BLOCKS 次抽样，直到标准误低于 tolerance。
+        返回 (比分概率估计矩阵, 实际模拟次数, 最大标准误, {市场: 等效样本量})。
+        """
+        if sampling not in SAMPLING_METHODS or sampling == 'random':
+            raise ValueError(f"不支持的方差缩减抽样方式: {sampling}")
+        
+        score_matrix = self.calculate_exact_score_matrix(home_xG, away_xG, league, distribution, max_goals, rho=rho, covariance=covariance)
+        if sampling == 'importance':
+            proposal, weights = importance_proposal(score_matrix)
+        else:
+            proposal, weights = score_matrix, None
+        
+        rng = self._get_rng(seed)
+        size = max_goals + 1
+        limit = max_simulations if tolerance is not None else num_simulations
+        block_size = chunk_size // VARIANCE_REDUCTION_BLOCKS if tolerance is not None else -(-limit // VARIANCE_REDUCTION_BLOCKS)
+        block_size = min(max(block_size, 1), chunk_size)
+        
+        # 每个比分累计的样本权重之和（非重要性抽样时即计数）
+        weight_sums = np.zeros((size, size))
+        block_markets = []
+        block_sizes = []
+        drawn = 0
+        while drawn < limit:
+            block = min(block_size, limit - drawn)
+            home_goals, away_goals = invert_score_matrix(proposal, uniform_points(sampling, block, rng))
+            block_sums = np.bincount(home_goals * size + away_goals, minlength=size * size).reshape(size, size).astype(float)
+            if weights is not None:
+                block_sums *= weights
+            weight_sums += block_sums
+            block_markets.append(error_market_probabilities(block_sums[None] / block)[0])
+            block_sizes.append(block)
+            drawn += block
+            count('simulation_chunks')
+            
+            if (tolerance is not None and len(block_sizes) % VARIANCE_REDUCTION_BLOCKS == 0
+                    and block_standard_error(block_markets, block_sizes)[0] < tolerance):
+                break
+        
+        count('simulations', drawn)
+        standard_error, effective_sample_size = block_standard_error(block_markets, block_sizes)
+        return weight_sums / drawn, drawn, standard_error, effective_sample_size
+
+    def _draw_goals(self, rng, home_xG, away_xG, league, distribution, size, rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+        """抽取一块主客队进球样本"""
+        if distribution == 'poisson':
+            return rng.poisson(home_xG, size), rng.poisson(away_xG, size)
+        if distribution == 'negative_binomial':
+            overdispersion = self.get_overdispersion(league)
+            n_home, p_home = get_nbinom_params(home_xG, overdispersion)
+            n_away, p_away = get_nbinom_params(away_xG, overdispersion)
+            # 标量参数分别调用比一次广播调用更快
+            return rng.negative_binomial(n_home, p_home, size), rng.negative_binomial(n_away, p_away, size)
+        if distribution == 'bivariate_poisson':
+            home_only, away_only, shared = bivariate_poisson_components(home_xG, away_xG, covariance)
+            shared_goals = rng.poisson(shared, size)
+            return rng.poisson(home_only, size) + shared_goals, rng.poisson(away_only, size) + shared_goals
+        if distribution == 'dixon_coles':
+            home_goals, away_goals = sample_from_score_matrices(dixon_coles_score_matrix(home_xG, away_xG, rho)[None], size, rng)
+            return home_goals[0], away_goals[0]
+        raise ValueError(f"不支持的分布类型: {distribution}")
+
+    def calculate_standard_error(self, score_counts, num_simulations):
+        """关键市场（主胜/平/客胜、大于2.5球、最可能比分）频率估计中最大的标准误"""
+        markets = summarize_score_matrices(score_counts[None] / num_simulations)
+        market_probs = np.array([
+            markets['home_win'][0], markets['draw'][0], markets['away_win'][0],
+            markets['prob_gt_2_5'][0], markets['most_likely_score_prob'][0]
+        ])
+        return float(np.sqrt(market_probs * (1 - market_probs) / num_simulations).max())
+
+    @timed()
+    def predict_match(self, home_team, away_team, league, distribution='poisson', num_simulations=10000, seed=None, tolerance=None,
+                      rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE, sampling='random'):
+        """流式模拟并汇总单场比赛概率（指定种子时结果可复现并写入缓存）
+        
+        sampling 为 random 以外的方差缩减方式时，结果附带各市场的等效样本量。
+        """
+        # 强度来源（统计数据或某次赛果拟合）也是键的一部分，换用新的拟合结果后不会读到旧的模拟
+        source = self.get_league_strengths(league)['source']
+        key = (league, home_team, away_team, distribution, num_simulations, seed, tolerance, self.bit_generator, rho, covariance, source,
+               sampling)
+        if seed is not None:
+            probs = self.cache.get(key)
+            count('cache_hits' if probs is not None else 'cache_misses')
+            if probs is not None:
+                return probs
+        
+        home_xG, away_xG = self.calculate_expected_goals(home_team, away_team, league)
+        if sampling != 'random':
+            score_probs, drawn, standard_error, effective_sample_size = self.monte_carlo_simulation_variance_reduced(
+                home_xG, away_xG, league, distribution, num_simulations, sampling, seed, tolerance,
+                rho=rho, covariance=covariance
+            )
+            probs = MatchSummary.from_matrix(score_probs, num_simulations=drawn, standard_error=standard_error,
+                                             effective_sample_size=effective_sample_size)
+        else:
+            score_counts, drawn = self.monte_carlo_simulation_streaming(
+                home_xG, away_xG, league, distribution, num_simulations, seed, tolerance,
+                rho=rho, covariance=covariance
+            )
+            # 只缓存 uint32 比分计数矩阵，不保留原始模拟数组
+            probs = MatchSummary.from_counts(score_counts, drawn, self.calculate_standard_error(score_counts, drawn))
+        if seed is not None:
+            # 写入缓存前构建累计表，缓存按显示时的完整大小计算内存占用
+            probs.markets
+            self.cache.put(key, probs)
+        return probs
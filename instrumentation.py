@@ -0,0 +1,154 @@
+"""分阶段计时与计数埋点：默认关闭，关闭时每个埋点只多一次 ContextVar 查询
+
+用法:
+    with recording() as recorder:       # 在当前线程/协程内启用
+        predictor.predict_match(...)
+    recorder.emit()                     # 以 JSON 结构化日志输出各阶段统计
+
+被 @timed 装饰的函数和 stage() 代码块只在启用记录时计时。记录器保存在 ContextVar 中，
+Streamlit 每个会话的脚本线程互不影响。
+"""
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger('football_predictor.instrumentation')
+
+_active = ContextVar('instrumentation_recorder', default=None)
+
+
+class StageRecorder:
+    """累计各阶段的调用次数、总耗时、最大耗时，以及自定义计数器"""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                self.stages[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def stage_records(self):
+        """按总耗时降序的阶段统计 [{'stage', 'calls', 'total_ms', 'mean_ms', 'max_ms'}]"""
+        records = [
+            {'stage': name, 'calls': calls, 'total_ms': total * 1000, 'mean_ms': total / calls * 1000, 'max_ms': longest * 1000}
+            for name, (calls, total, longest) in self.stages.items()
+        ]
+        return sorted(records, key=lambda record: record['total_ms'], reverse=True)
+
+    def events(self, **context):
+        """结构化事件列表：每个阶段和计数器各一条，context 中的字段附加到每条记录"""
+        events = [{'event': 'stage', **context, **record} for record in self.stage_records()]
+        events += [{'event': 'counter', **context, 'counter': name, 'value': value} for name, value in self.counters.items()]
+        return events
+
+    def emit(self, log=logger, level=logging.INFO, **context):
+        """把结构化事件逐条以 JSON 写入日志"""
+        for event in self.events(**context):
+            log.log(level, json.dumps(event, ensure_ascii=False))
+
+
+def active_recorder():
+    """当前上下文中启用的记录器，未启用时为 None"""
+    return _active.get()
+
+
+@contextmanager
+def recording(recorder=None):
+    """在代码块内启用记录，返回记录器"""
+    recorder = recorder if recorder is not None else StageRecorder()
+    token = _active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.reset(token)
+
+
+class _Stage:
+    __slots__ = ('recorder', 'name', 'start')
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """为代码块计时；未启用记录时返回共享的空上下文"""
+    recorder = _active.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return _Stage(recorder, name)
+
+
+def count(name, n=1):
+    """累加计数器（例如抽样次数、缓存命中）"""
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.count(name, n)
+
+
+def timed(name=None):
+    """函数计时装饰器，阶段名默认为函数的限定名"""
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _active.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.record(stage_name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def profile_call(func, *args, sort='cumulative', limit=30, **kwargs):
+    """用 cProfile 运行一次 func，返回 (返回值, 按 sort 排序的前 limit 行统计文本)"""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    output = io.StringIO()
+    pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+    return result, output.getvalue()
@@ -0,0 +1,132 @@
+"""预测服务的本地压测：大量并发 keep-alive 连接持续发送单场预测请求，统计延迟分位数与吞吐量
+
+用法示例:
+    python load_test.py --spawn --workers 2 --concurrency 300 --requests 6000
+    python load_test.py --port 8765 --method monte_carlo --num-simulations 5000
+
+--spawn 时先启动 predict_service.py 子进程，压测结束后关闭。
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from predict_service import DEFAULT_HOST, DEFAULT_PORT
+from team_store import TeamDataStore
+
+
+def build_fixtures(count, seed=0):
+    """从球队数据中随机抽取主客不同的对阵"""
+    store = TeamDataStore()
+    rng = np.random.default_rng(seed)
+    leagues = store.league_names()
+    fixtures = []
+    for league in rng.choice(leagues, count):
+        teams = store.get_league(league).teams
+        home, away = rng.choice(len(teams), 2, replace=False)
+        fixtures.append({'league': str(league), 'home_team': str(teams[home]), 'away_team': str(teams[away])})
+    return fixtures
+
+
+async def post(reader, writer, host, body):
+    """在已有连接上发送一次 POST /predict，返回 (状态码, 响应体)"""
+    writer.write((f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, requests, options, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for fixture in requests:
+            body = json.dumps({**fixture, **options}, ensure_ascii=False).encode('utf-8')
+            start = time.perf_counter()
+            status, _ = await post(reader, writer, host, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load_test(host, port, concurrency, total_requests, options):
+    fixtures = build_fixtures(total_requests)
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, fixtures[i::concurrency], options, latencies, statuses)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    return np.array(latencies), statuses, elapsed
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"预测服务在 {timeout} 秒内没有启动")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="预测服务压测")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--concurrency', type=int, default=300, help="并发连接数")
+    parser.add_argument('--requests', type=int, default=6000, help="请求总数")
+    parser.add_argument('--distribution', default='poisson')
+    parser.add_argument('--method', default='exact')
+    parser.add_argument('--num-simulations', type=int, default=10000)
+    parser.add_argument('--spawn', action='store_true', help="启动本地预测服务子进程")
+    parser.add_argument('--workers', type=int, default=1, help="--spawn 时服务的工作进程数")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'predict_service.py'),
+            '--host', args.host, '--port', str(args.port), '--workers', str(args.workers)
+        ])
+    try:
+        if server is not None:
+            asyncio.run(wait_for_server(args.host, args.port))
+        options = {'distribution': args.distribution, 'method': args.method, 'num_simulations': args.num_simulations}
+        latencies, statuses, elapsed = asyncio.run(
+            run_load_test(args.host, args.port, args.concurrency, args.requests, options))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"请求数 {len(latencies)}，并发 {args.concurrency}，耗时 {elapsed:.2f} 秒，吞吐量 {len(latencies) / elapsed:,.0f} 请求/秒")
+    print(f"延迟 p50 {p50:.1f} ms | p95 {p95:.1f} ms | p99 {p99:.1f} ms | 最大 {latencies.max() * 1000:.1f} ms")
+    print(f"状态码 {dict(sorted(statuses.items()))}")
+    return 0 if set(statuses) == {200} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
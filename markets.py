@@ -0,0 +1,158 @@
+"""比赛市场查询：由比分概率矩阵一次性构建总进球、净胜球累计表，之后任意盘口都是 O(1) 查表
+
+盘口约定:
+    大小球 line=2.5 表示总进球 > 2.5 为大；整数盘（如 3）进球数恰好等于盘口时走盘退本金；
+    亚洲让球 line 为主队让/受让球数（-0.75 表示主队让 0.75 球），按 净胜球 + line 结算；
+    四分之一盘（x.25 / x.75）拆成相邻两个半盘各下一半注。
+结算概率 (赢, 走, 输) 按注额加权：四分之一盘赢半 / 输半分别计为 0.5 个赢 / 输。
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+# 价格表默认包含的盘口
+LADDER_TOTAL_LINES = np.arange(0.5, 6.51, 0.25)
+LADDER_HANDICAP_LINES = np.arange(-3.0, 3.01, 0.25)
+
+
+def split_line(line):
+    """四分之一盘拆成两个相邻的半盘/整盘，其他盘口原样返回"""
+    quarters = round(line * 4)
+    if abs(quarters - line * 4) > 1e-9:
+        raise ValueError(f"盘口必须是 0.25 的整数倍: {line}")
+    if quarters % 2:
+        return ((quarters - 1) / 4, (quarters + 1) / 4)
+    return (quarters / 4,)
+
+
+def fair_odds(win, lose):
+    """公平小数赔率：期望收益为零时 赢 × (赔率 - 1) = 输"""
+    if win <= 0:
+        return np.inf
+    return 1 + lose / win
+
+
+class MarketTables:
+    """单场比赛的累计概率表
+
+    total_cdf[k] = P(总进球 ≤ k)，diff_cdf[d + offset] = P(主队净胜球 ≤ d)，offset = 客队进球上限。
+    """
+
+    def __init__(self, score_matrix):
+        score_matrix = np.asarray(score_matrix, dtype=float)
+        rows, cols = score_matrix.shape
+        self.score_matrix = score_matrix
+        self.total_mass = float(score_matrix.sum())
+
+        total_index = np.add.outer(np.arange(rows), np.arange(cols))
+        self.total_probs = np.bincount(total_index.ravel(), weights=score_matrix.ravel())
+        self.total_cdf = np.cumsum(self.total_probs)
+
+        # 净胜球 d 存放在下标 d + cols - 1
+        self.diff_offset = cols - 1
+        diff_index = np.subtract.outer(np.arange(rows), np.arange(cols)) + self.diff_offset
+        self.diff_probs = np.bincount(diff_index.ravel(), weights=score_matrix.ravel())
+        self.diff_cdf = np.cumsum(self.diff_probs)
+
+        self.home_scoreless = float(score_matrix[0].sum())
+        self.away_scoreless = float(score_matrix[:, 0].sum())
+
+    def __sizeof__(self):
+        arrays = (self.score_matrix, self.total_probs, self.total_cdf, self.diff_probs, self.diff_cdf)
+        return object.__sizeof__(self) + sum(sys.getsizeof(array) for array in arrays)
+
+    # —— 累计表查询 ——
+    def total_at_most(self, goals):
+        """P(总进球 ≤ goals)"""
+        if goals < 0:
+            return 0.0
+        return float(self.total_cdf[min(int(goals), len(self.total_cdf) - 1)])
+
+    def total_exactly(self, goals):
+        """P(总进球 = goals)"""
+        return self.total_at_most(goals) - self.total_at_most(goals - 1)
+
+    def diff_at_most(self, goals):
+        """P(主队净胜球 ≤ goals)，goals 可以为负"""
+        index = int(goals) + self.diff_offset
+        if index < 0:
+            return 0.0
+        return float(self.diff_cdf[min(index, len(self.diff_cdf) - 1)])
+
+    def diff_at_least(self, goals):
+        """P(主队净胜球 ≥ goals)"""
+        return self.total_mass - self.diff_at_most(goals - 1)
+
+    def diff_exactly(self, goals):
+        """P(主队净胜球 = goals)"""
+        return self.diff_at_most(goals) - self.diff_at_most(goals - 1)
+
+    # —— 市场 ——
+    def match_result(self):
+        """(主胜, 平局, 客胜)"""
+        return self.diff_at_least(1), self.diff_exactly(0), self.diff_at_most(-1)
+
+    def both_teams_to_score(self):
+        """双方都进球的概率"""
+        return self.total_mass - self.home_scoreless - self.away_scoreless + float(self.score_matrix[0, 0])
+
+    def exact_score(self, home_goals, away_goals):
+        """指定比分的概率（超出矩阵范围时为 0；截断矩阵的最后一档包含尾部概率）"""
+        rows, cols = self.score_matrix.shape
+        if not (0 <= home_goals < rows and 0 <= away_goals < cols):
+            return 0.0
+        return float(self.score_matrix[home_goals, away_goals])
+
+    def over_under(self, line):
+        """大小球结算概率：返回大球的 (赢, 走, 输)，小球的赢/输与之互换"""
+        win = push = 0.0
+        parts = split_line(line)
+        for part in parts:
+            floor = int(np.floor(part))
+            win += self.total_mass - self.total_at_most(floor)
+            if part == floor:
+                push += self.total_exactly(floor)
+        win /= len(parts)
+        push /= len(parts)
+        return win, push, self.total_mass - win - push
+
+    def asian_handicap(self, line):
+        """亚洲让球盘主队的 (赢, 走, 输)；line 为主队让球数（负数表示让球）"""
+        win = push = 0.0
+        parts = split_line(line)
+        for part in parts:
+            # 主队 净胜球 + part > 0 为赢
+            threshold = -part
+            floor = int(np.floor(threshold))
+            win += self.total_mass - self.diff_at_most(floor)
+            if threshold == floor:
+                push += self.diff_exactly(floor)
+        win /= len(parts)
+        push /= len(parts)
+        return win, push, self.total_mass - win - push
+
+    def price_ladder(self, total_lines=LADDER_TOTAL_LINES, handicap_lines=LADDER_HANDICAP_LINES):
+        """完整价格表：胜平负、双方进球、各大小球和让球盘的概率与公平赔率"""
+        rows = []
+
+        def add(market, line, selection, win, push, lose):
+            rows.append((market, line, selection, win, push, lose, fair_odds(win, lose)))
+
+        home, draw, away = self.match_result()
+        add('1X2', np.nan, 'home', home, 0.0, self.total_mass - home)
+        add('1X2', np.nan, 'draw', draw, 0.0, self.total_mass - draw)
+        add('1X2', np.nan, 'away', away, 0.0, self.total_mass - away)
+        btts = self.both_teams_to_score()
+        add('btts', np.nan, 'yes', btts, 0.0, self.total_mass - btts)
+        add('btts', np.nan, 'no', self.total_mass - btts, 0.0, btts)
+        for line in total_lines:
+            win, push, lose = self.over_under(line)
+            add('total', line, 'over', win, push, lose)
+            add('total', line, 'under', lose, push, win)
+        for line in handicap_lines:
+            win, push, lose = self.asian_handicap(line)
+            add('asian_handicap', line, 'home', win, push, lose)
+            add('asian_handicap', -line, 'away', lose, push, win)
+
+        return pd.DataFrame(rows, columns=['market', 'line', 'selection', 'win', 'push', 'lose', 'fair_odds'])
@@ -0,0 +1,198 @@
+"""紧凑的比赛结果表示：模拟结果只保留 uint32 比分计数矩阵，衍生概率在访问时从累计表计算
+
+MatchSummary 替代原来的结果字典，仍支持 summary['prob_gt_2_5'] 形式的按键读取；
+需要保留原始样本时使用 GoalSamples（int8 进球数，总进球和净胜球按需计算）。
+"""
+import sys
+
+import numpy as np
+
+from markets import MarketTables
+
+# 单队进球数在 int8 中的上限；使用有符号类型，解包后 home - away 不会回绕
+MAX_SAMPLE_GOALS = np.iinfo(np.int8).max
+
+
+def _narrow(goals):
+    """转为 int8 进球数，已是 int8 时不复制；超过上限的极端尾部样本截断到 MAX_SAMPLE_GOALS"""
+    goals = np.asarray(goals)
+    if goals.dtype == np.int8:
+        return goals
+    if goals.size and goals.max() > MAX_SAMPLE_GOALS:
+        goals = np.minimum(goals, MAX_SAMPLE_GOALS)
+    return goals.astype(np.int8)
+
+
+class GoalSamples:
+    """主客队进球样本（int8），总进球数和净胜球按需计算（int16）；可以像原来的三元组一样解包"""
+
+    __slots__ = ('home_goals', 'away_goals')
+
+    def __init__(self, home_goals, away_goals):
+        self.home_goals = _narrow(home_goals)
+        self.away_goals = _narrow(away_goals)
+
+    def __len__(self):
+        return len(self.home_goals)
+
+    def __iter__(self):
+        yield self.home_goals
+        yield self.away_goals
+        yield self.total_goals
+
+    @property
+    def total_goals(self):
+        return self.home_goals.astype(np.int16) + self.away_goals
+
+    @property
+    def goal_diffs(self):
+        """主队净胜球（主队进球 - 客队进球）"""
+        return self.home_goals.astype(np.int16) - self.away_goals
+
+    def score_counts(self):
+        """主队进球 × 客队进球的 uint32 计数矩阵"""
+        rows = int(self.home_goals.max()) + 1
+        cols = int(self.away_goals.max()) + 1
+        # 先显式转为 intp 再计算下标，不依赖 NumPy 版本的类型提升规则；原地运算只分配一个下标数组
+        flat = self.home_goals.astype(np.intp)
+        flat *= cols
+        flat += self.away_goals
+        return np.bincount(flat, minlength=rows * cols).reshape(rows, cols).astype(np.uint32)
+
+
+class MatchSummary:
+    """单场比赛的汇总结果
+
+    模拟结果保存 score_counts（uint32）与模拟次数，解析结果和加权（重要性抽样）估计保存比分概率矩阵；
+    总进球分布、各市场概率和前 N 比分都由懒构建的 MarketTables 查询得到。
+    """
+
+    __slots__ = ('score_counts', 'num_simulations', 'standard_error', 'effective_sample_size', 'top_n', '_score_matrix', '_markets')
+
+    # 支持按键读取的字段（与原结果字典的键一致）
+    KEYS = frozenset([
+        'unique_goals', 'goal_probabilities', 'prob_0_1', 'prob_2_3', 'prob_4_6', 'prob_7_plus',
+        'prob_gt_2_5', 'prob_gt_3_5', 'most_common_goals', 'most_likely_score', 'most_likely_score_prob',
+        'top_scores', 'score_matrix', 'total_goal_probabilities', 'markets', 'score_counts',
+        'num_simulations', 'standard_error', 'effective_sample_size'
+    ])
+
+    def __init__(self, score_counts=None, num_simulations=None, score_matrix=None, standard_error=None, top_n=5,
+                 effective_sample_size=None):
+        if (score_counts is None) == (score_matrix is None):
+            raise ValueError("需要且只能提供比分计数矩阵或比分概率矩阵之一")
+        self.score_counts = None if score_counts is None else np.asarray(score_counts).astype(np.uint32)
+        self.num_simulations = num_simulations
+        self.standard_error = standard_error
+        # 方差缩减模拟时为 {市场: 等效样本量}
+        self.effective_sample_size = effective_sample_size
+        self.top_n = top_n
+        self._score_matrix = None if score_matrix is None else np.asarray(score_matrix, dtype=float)
+        self._markets = None
+
+    @classmethod
+    def from_counts(cls, score_counts, num_simulations, standard_error=None, top_n=5):
+        """由模拟得到的比分计数构建"""
+        return cls(score_counts=score_counts, num_simulations=num_simulations, standard_error=standard_error, top_n=top_n)
+
+    @classmethod
+    def from_matrix(cls, score_matrix, top_n=5, num_simulations=None, standard_error=None, effective_sample_size=None):
+        """由比分概率矩阵构建（解析计算，或提供模拟次数时为方差缩减模拟的估计）"""
+        return cls(num_simulations=num_simulations, score_matrix=score_matrix, standard_error=standard_error, top_n=top_n,
+                   effective_sample_size=effective_sample_size)
+
+    def __sizeof__(self):
+        arrays = [array for array in (self.score_counts, self._score_matrix) if array is not None]
+        size = object.__sizeof__(self) + sum(sys.getsizeof(array) for array in arrays)
+        if self._markets is not None:
+            size += sys.getsizeof(self._markets)
+        return size
+
+    # —— 按键读取，兼容原结果字典 ——
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.KEYS and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    # —— 概率矩阵与累计表 ——
+    @property
+    def score_matrix(self):
+        """比分概率矩阵（模拟结果按计数 / 模拟次数计算，只在构建累计表时用到）"""
+        if self._score_matrix is not None:
+            return self._score_matrix
+        return self.score_counts / self.num_simulations
+
+    @property
+    def markets(self):
+        if self._markets is None:
+            self._markets = MarketTables(self.score_matrix)
+        return self._markets
+
+    @property
+    def is_exact(self):
+        return self.num_simulations is None
+
+    # —— 总进球分布 ——
+    @property
+    def total_goal_probabilities(self):
+        return self.markets.total_probs
+
+    @property
+    def unique_goals(self):
+        return np.flatnonzero(self.markets.total_probs)
+
+    @property
+    def goal_probabilities(self):
+        return self.markets.total_probs[self.unique_goals]
+
+    @property
+    def most_common_goals(self):
+        return int(np.argmax(self.markets.total_probs))
+
+    @property
+    def prob_0_1(self):
+        return self.markets.total_at_most(1)
+
+    @property
+    def prob_2_3(self):
+        return self.markets.total_at_most(3) - self.markets.total_at_most(1)
+
+    @property
+    def prob_4_6(self):
+        return self.markets.total_at_most(6) - self.markets.total_at_most(3)
+
+    @property
+    def prob_7_plus(self):
+        return self.markets.total_mass - self.markets.total_at_most(6)
+
+    @property
+    def prob_gt_2_5(self):
+        return self.markets.total_mass - self.markets.total_at_most(2)
+
+    @property
+    def prob_gt_3_5(self):
+        return self.markets.total_mass - self.markets.total_at_most(3)
+
+    # —— 比分 ——
+    @property
+    def top_scores(self):
+        """按概率降序的前 top_n 个比分（概率相同时取进球少的比分）"""
+        matrix = self.markets.score_matrix
+        cols = matrix.shape[1]
+        flat = matrix.ravel()
+        top_index = np.argsort(-flat, kind='stable')[:self.top_n]
+        return [(f"{i // cols}-{i % cols}", flat[i]) for i in top_index]
+
+    @property
+    def most_likely_score(self):
+        return self.top_scores[0][0]
+
+    @property
+    def most_likely_score_prob(self):
+        return self.top_scores[0][1]
@@ -0,0 +1,222 @@
+"""命令行批量预测：从 CSV / JSONL 读取对阵，逐行输出预测结果（不依赖 Streamlit）
+
+用法示例:
+    python predict_cli.py fixtures.csv > predictions.jsonl
+    cat fixtures.jsonl | python predict_cli.py --format jsonl --method monte_carlo --workers 4
+    python predict_cli.py fixtures.csv --distribution dixon_coles --rho -0.1
+
+输入字段为 league, home_team, away_team；CSV 需要表头。
+"""
+import argparse
+import contextlib
+import csv
+import json
+import logging
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from football_predictor import BIVARIATE_COVARIANCE, DIXON_COLES_RHO, MAX_GOALS, SUMMARY_COLUMNS, FootballPoissonPredictor
+from instrumentation import recording
+from strength_fitter import StrengthFitter
+
+FIXTURE_COLUMNS = ['league', 'home_team', 'away_team']
+
+DISTRIBUTIONS = ('poisson', 'negative_binomial', 'dixon_coles', 'bivariate_poisson')
+METHODS = ('exact', 'monte_carlo')
+
+# CSV 输出的固定表头（与第一条记录是否出错无关）
+OUTPUT_COLUMNS = FIXTURE_COLUMNS + ['home_xG', 'away_xG', *SUMMARY_COLUMNS, 'error']
+
+# 每个任务包含的对阵数
+DEFAULT_BATCH_SIZE = 500
+
+# 工作进程内的预测器，由 _init_worker 创建
+_predictor = None
+
+
+def _init_worker(results=None):
+    """创建进程内的预测器；results 为历史赛果 CSV 路径时改用拟合的球队强度"""
+    global _predictor
+    _predictor = FootballPoissonPredictor()
+    if results is not None:
+        _predictor.use_fitted_strengths(StrengthFitter.from_csv(results))
+
+
+def predict_batch(fixtures, distribution, method, num_simulations, seed, rho=DIXON_COLES_RHO, covariance=BIVARIATE_COVARIANCE):
+    """预测一批对阵，返回结果字典列表；球队或联赛不存在的对阵输出 error 字段
+
+    fixtures 中读取阶段已出错的行是错误字典，原样按位置输出。
+    """
+    if _predictor is None:
+        _init_worker()
+
+    # 按联赛分组，用球队索引检查名称，预期进球只在 predict_fixtures 中按联赛向量化计算一次
+    errors = {}
+    groups = {}
+    for i, fixture in enumerate(fixtures):
+        if isinstance(fixture, dict):
+            errors[i] = fixture
+        else:
+            groups.setdefault(fixture[0], []).append(i)
+    for league, indices in groups.items():
+        try:
+            index = _predictor.get_league_strengths(league)['index']
+        except ValueError as e:
+            errors.update((i, _fixture_error(dict(zip(FIXTURE_COLUMNS, fixtures[i])), str(e))) for i in indices)
+            continue
+        for i in indices:
+            missing = [team for team in fixtures[i][1:] if team not in index]
+            if missing:
+                errors[i] = _fixture_error(dict(zip(FIXTURE_COLUMNS, fixtures[i])),
+                                           f"球队数据不存在: {', '.join(missing)}，请检查球队名称是否正确")
+    valid = [fixture for i, fixture in enumerate(fixtures) if i not in errors]
+
+    predictions = iter([])
+    if valid:
+        predictions = iter(_predictor.predict_fixtures(
+            valid, distribution, method, num_simulations, MAX_GOALS, seed, rho, covariance
+        ).to_dict('records'))
+    return [errors[i] if i in errors else next(predictions) for i in range(len(fixtures))]
+
+
+def _fixture_error(row, message):
+    fields = row if isinstance(row, dict) else {}
+    return {**{column: fields.get(column) for column in FIXTURE_COLUMNS}, 'error': message}
+
+
+def read_fixtures(stream, input_format):
+    """逐行读取对阵 (联赛, 主队, 客队)；字段缺失、不是字符串或 JSON 无法解析的行产出错误字典，不中断整个流"""
+    if input_format == 'csv':
+        rows = csv.DictReader(stream)
+    else:
+        rows = (line for line in stream if line.strip())
+    for row in rows:
+        if input_format != 'csv':
+            try:
+                row = json.loads(row)
+            except json.JSONDecodeError as e:
+                yield _fixture_error(None, f"JSON 无法解析: {e}")
+                continue
+        if not isinstance(row, dict):
+            yield _fixture_error(None, "每行需要是包含 league、home_team、away_team 的对象")
+            continue
+        # CSV 行缺少列时对应值为 None
+        missing = [column for column in FIXTURE_COLUMNS if row.get(column) is None]
+        if missing:
+            yield _fixture_error(row, f"缺少字段: {', '.join(missing)}")
+            continue
+        # JSONL 中字段可能是数组、数字等，与 predict_service.parse_fixture 一样只接受字符串
+        invalid = [column for column in FIXTURE_COLUMNS if not isinstance(row[column], str)]
+        if invalid:
+            yield _fixture_error(row, f"字段需要是字符串: {', '.join(invalid)}")
+            continue
+        yield tuple(row[column] for column in FIXTURE_COLUMNS)
+
+
+def iter_batches(fixtures, batch_size):
+    """把对阵流切分为固定大小的批次"""
+    while True:
+        batch = list(islice(fixtures, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def predict_stream(fixtures, distribution='poisson', method='exact', num_simulations=10000,
+                   seed=None, workers=1, batch_size=DEFAULT_BATCH_SIZE, results=None, rho=DIXON_COLES_RHO,
+                   covariance=BIVARIATE_COVARIANCE):
+    """按输入顺序逐条产出预测结果
+
+    workers > 1 时使用进程池，同时在途的批次不超过 2 × workers，内存占用与输入规模无关。
+    每批使用 SeedSequence 派生的子种子，结果与进程数无关。
+    """
+    seed_sequence = np.random.SeedSequence(seed)
+    batches = ((batch, seed_sequence.spawn(1)[0]) for batch in iter_batches(iter(fixtures), batch_size))
+
+    if workers <= 1:
+        _init_worker(results)
+        for batch, batch_seed in batches:
+            yield from predict_batch(batch, distribution, method, num_simulations, batch_seed, rho, covariance)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(results,)) as executor:
+        pending = deque()
+        for batch, batch_seed in batches:
+            pending.append(executor.submit(predict_batch, batch, distribution, method, num_simulations, batch_seed,
+                                           rho, covariance))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_records(records, stream, output_format):
+    """逐条写出结果并及时刷新"""
+    writer = None
+    for record in records:
+        if output_format == 'csv':
+            if writer is None:
+                writer = csv.DictWriter(stream, fieldnames=OUTPUT_COLUMNS, extrasaction='ignore', restval='')
+                writer.writeheader()
+            writer.writerow(record)
+        else:
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        stream.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="足球比赛批量预测")
+    parser.add_argument('input', nargs='?', default='-', help="对阵文件路径，默认从标准输入读取")
+    parser.add_argument('-o', '--output', default='-', help="输出文件路径，默认写到标准输出")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="输入格式，默认按文件扩展名判断，标准输入默认为 csv")
+    parser.add_argument('--output-format', choices=['csv', 'jsonl'], default='jsonl', help="输出格式")
+    parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='poisson')
+    parser.add_argument('--method', choices=METHODS, default='exact')
+    parser.add_argument('--rho', type=float, default=DIXON_COLES_RHO, help="Dixon-Coles 低比分修正参数 ρ")
+    parser.add_argument('--covariance', type=float, default=BIVARIATE_COVARIANCE, help="双变量泊松共同进球分量 λ3")
+    parser.add_argument('--simulations', type=int, default=10000, help="蒙特卡洛模拟次数")
+    parser.add_argument('--seed', type=int, help="随机种子")
+    parser.add_argument('--workers', type=int, default=1, help="工作进程数")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="每个任务包含的对阵数")
+    parser.add_argument('--results', help="历史赛果 CSV，提供时按时间衰减泊松回归拟合球队强度")
+    parser.add_argument('--timings', action='store_true', help="运行结束后把各阶段耗时以 JSON 日志写到标准错误（只统计主进程）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    input_format = args.format or ('jsonl' if args.input.endswith(('.jsonl', '.json')) else 'csv')
+
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8-sig', newline='')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    if args.timings:
+        logging.basicConfig(stream=sys.stderr, level=logging.INFO, format='%(message)s')
+    try:
+        # 计时默认关闭：未指定 --timings 时不启用记录器，@timed 只多一次上下文变量读取
+        with recording() if args.timings else contextlib.nullcontext() as recorder:
+            records = predict_stream(
+                read_fixtures(source, input_format), args.distribution, args.method, args.simulations,
+                args.seed, args.workers, args.batch_size, args.results, args.rho, args.covariance
+            )
+            write_records(records, target, args.output_format)
+        if args.timings:
+            recorder.emit(workers=args.workers)
+    except BrokenPipeError:
+        # 下游提前关闭管道（例如 head），把标准输出指向 devnull 以免退出时再次报错
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""本地异步预测服务：把并发到达的对阵请求合并成微批次，在工作进程中一次向量化计算
+
+用法示例:
+    python predict_service.py --port 8765 --workers 2
+    curl -X POST localhost:8765/predict -d '{"league": "英超", "home_team": "阿森纳", "away_team": "切尔西"}'
+    curl -X POST localhost:8765/predict -d '{"fixtures": [["英超", "阿森纳", "切尔西"], ["西甲", "皇家马德里", "巴塞罗那"]]}'
+
+接口:
+    POST /predict  单场对阵返回一个 JSON 对象；fixtures 列表以分块传输按输入顺序逐行返回 JSON，每行在所在批次算完后立即写出
+                   可选字段 distribution、method、num_simulations
+    GET  /health   队列长度等运行状态
+
+同一计算参数的请求在 batch_window 秒内（或攒满 max_batch_size 场时）合并为一批，交给进程池中的
+predict_cli.predict_batch 一次完成预期进球和比分矩阵计算。排队和计算中的对阵超过 max_pending 时直接返回 503，请求体超过 MAX_BODY_BYTES 时返回 413。
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from predict_cli import DISTRIBUTIONS, METHODS, _init_worker, predict_batch
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# 微批次的收集窗口（秒）和单批最大对阵数
+BATCH_WINDOW = 0.005
+MAX_BATCH_SIZE = 256
+
+# 排队与计算中的对阵上限，超过后返回 503
+MAX_PENDING = 10_000
+
+# 单个请求体上限（字节）
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class ServiceOverloaded(Exception):
+    """排队对阵超过上限"""
+
+
+class RequestTooLarge(Exception):
+    """请求体超过 MAX_BODY_BYTES"""
+
+
+class MicroBatcher:
+    """按 (分布, 计算方式, 模拟次数) 分组收集对阵，窗口到期或攒满后整批提交到进程池"""
+
+    def __init__(self, executor, workers, batch_window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE,
+                 max_pending=MAX_PENDING, seed=None):
+        self.executor = executor
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.pending = 0
+        self.batches = 0
+        self._queues = {}
+        self._timers = {}
+        # 同时在途的批次数不超过 2 × 进程数，其余批次在事件循环中排队
+        self._in_flight = asyncio.Semaphore(2 * workers)
+
+    def submit(self, fixtures, options):
+        """加入一组对阵，返回与之一一对应的 Future 列表"""
+        if self.pending + len(fixtures) > self.max_pending:
+            raise ServiceOverloaded()
+        loop = asyncio.get_running_loop()
+        queue = self._queues.setdefault(options, [])
+        futures = []
+        for fixture in fixtures:
+            future = loop.create_future()
+            queue.append((fixture, future))
+            futures.append(future)
+        self.pending += len(fixtures)
+
+        while len(queue) >= self.max_batch_size:
+            self._flush(options, self.max_batch_size)
+        if queue and options not in self._timers:
+            self._timers[options] = loop.call_later(self.batch_window, self._flush, options)
+        return futures
+
+    def _flush(self, options, size=None):
+        queue = self._queues.get(options, [])
+        batch = queue[:size] if size else queue[:]
+        del queue[:len(batch)]
+        if not queue:
+            timer = self._timers.pop(options, None)
+            if timer is not None:
+                timer.cancel()
+        if batch:
+            asyncio.ensure_future(self._run(options, batch))
+
+    async def _run(self, options, batch):
+        distribution, method, num_simulations = options
+        fixtures = [fixture for fixture, _ in batch]
+        async with self._in_flight:
+            try:
+                records = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, predict_batch, fixtures, distribution, method, num_simulations,
+                    self.seed_sequence.spawn(1)[0]
+                )
+            except Exception as e:
+                records = [{'error': f"计算失败: {e}"}] * len(batch)
+        self.batches += 1
+        self.pending -= len(batch)
+        for (_, future), record in zip(batch, records):
+            if not future.done():
+                future.set_result(record)
+
+
+def parse_fixture(item):
+    """对阵可以是 {"league", "home_team", "away_team"} 对象或 [联赛, 主队, 客队] 数组"""
+    if isinstance(item, dict):
+        item = [item.get('league'), item.get('home_team'), item.get('away_team')]
+    if not isinstance(item, (list, tuple)) or len(item) != 3 or not all(isinstance(value, str) for value in item):
+        raise ValueError("对阵需要包含 league、home_team、away_team 三个字符串字段")
+    return tuple(item)
+
+
+def parse_options(payload):
+    distribution = payload.get('distribution', 'poisson')
+    method = payload.get('method', 'exact')
+    num_simulations = payload.get('num_simulations', 10000)
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"不支持的分布类型: {distribution}")
+    if method not in METHODS:
+        raise ValueError(f"不支持的计算方式: {method}")
+    # JSON 的 true / false 在 Python 中是 bool（int 的子类），需要单独排除
+    if isinstance(num_simulations, bool) or not isinstance(num_simulations, int) or not 1 <= num_simulations <= 1_000_000:
+        raise ValueError("num_simulations 需要是 1 到 1000000 之间的整数")
+    return distribution, method, num_simulations
+
+
+class PredictionService:
+    """基于 asyncio.start_server 的最小 HTTP/1.1 服务（支持 keep-alive）"""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except RequestTooLarge:
+                    # 请求体没有读取，连接无法继续复用：返回 413 后关闭
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                        {'error': f"请求体不能超过 {MAX_BODY_BYTES} 字节"}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._dispatch(writer, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # 连接中断或请求头无法解析时直接关闭连接
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            return None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY_BYTES:
+            raise RequestTooLarge()
+        body = await reader.readexactly(length) if length else b''
+        return method, path, headers, body
+
+    async def _dispatch(self, writer, method, path, body, keep_alive):
+        if method == 'GET' and path == '/health':
+            status = {'status': 'ok', 'pending': self.batcher.pending, 'batches': self.batcher.batches}
+            await self._respond(writer, HTTPStatus.OK, status, keep_alive)
+            return
+        if path != '/predict':
+            await self._respond(writer, HTTPStatus.NOT_FOUND, {'error': "未知路径"}, keep_alive)
+            return
+        if method != 'POST':
+            await self._respond(writer, HTTPStatus.METHOD_NOT_ALLOWED, {'error': "只支持 POST"}, keep_alive)
+            return
+
+        try:
+            payload = json.loads(body or b'{}')
+            if not isinstance(payload, dict):
+                raise ValueError("请求体需要是 JSON 对象")
+            options = parse_options(payload)
+            many = 'fixtures' in payload
+            fixtures = [parse_fixture(item) for item in payload['fixtures']] if many else [parse_fixture(payload)]
+            futures = self.batcher.submit(fixtures, options)
+        except ServiceOverloaded:
+            await self._respond(writer, HTTPStatus.SERVICE_UNAVAILABLE, {'error': "服务繁忙，请稍后重试"}, keep_alive,
+                                extra_headers={'Retry-After': '1'})
+            return
+        except (ValueError, TypeError) as e:
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': str(e)}, keep_alive)
+            return
+
+        if not many:
+            await self._respond(writer, HTTPStatus.OK, await futures[0], keep_alive)
+            return
+
+        # 多场对阵：分块传输，每场一行 JSON
+        writer.write(self._status_line(HTTPStatus.OK, {
+            'Content-Type': 'application/x-ndjson; charset=utf-8',
+            'Transfer-Encoding': 'chunked',
+            'Connection': 'keep-alive' if keep_alive else 'close'
+        }))
+        for future in futures:
+            line = (json.dumps(await future, ensure_ascii=False) + '\n').encode('utf-8')
+            writer.write(f"{len(line):x}\r\n".encode('ascii') + line + b'\r\n')
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    @staticmethod
+    def _status_line(status, headers):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"] + [f"{name}: {value}" for name, value in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _respond(self, writer, status, payload, keep_alive, extra_headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Content-Length': str(len(body)),
+            'Connection': 'keep-alive' if keep_alive else 'close',
+            **(extra_headers or {})
+        }
+        writer.write(self._status_line(status, headers) + body)
+        await writer.drain()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=1, batch_window=BATCH_WINDOW,
+                max_batch_size=MAX_BATCH_SIZE, max_pending=MAX_PENDING, seed=None, results=None):
+    """启动服务，直到收到 SIGTERM 或 SIGINT"""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(results,)) as executor:
+        batcher = MicroBatcher(executor, workers, batch_window, max_batch_size, max_pending, seed)
+        service = PredictionService(batcher)
+        server = await asyncio.start_server(service.handle_connection, host, port, backlog=1024)
+        print(f"预测服务已启动: http://{host}:{port}（{workers} 个工作进程）", file=sys.stderr, flush=True)
+        
+        # 收到 SIGTERM / SIGINT 时正常退出，保证进程池的工作进程随服务一起关闭
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+        async with server:
+            await stop.wait()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="足球比赛预测 HTTP 服务")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=1, help="工作进程数")
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW, help="微批次收集窗口（秒）")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE, help="单批最大对阵数")
+    parser.add_argument('--max-pending', type=int, default=MAX_PENDING, help="排队对阵上限，超过后返回 503")
+    parser.add_argument('--seed', type=int, help="蒙特卡洛模拟的随机种子")
+    parser.add_argument('--results', help="历史赛果 CSV，提供时使用拟合的球队强度")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    asyncio.run(serve(args.host, args.port, args.workers, args.batch_window, args.max_batch_size,
+                      args.max_pending, args.seed, args.results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""随机数流：可选位生成器，并通过 SeedSequence 为线程/进程派生互不相关的子流"""
+import numpy as np
+
+BIT_GENERATORS = {
+    'PCG64': np.random.PCG64,
+    'Philox': np.random.Philox
+}
+
+
+def make_generator(seed=None, bit_generator='PCG64'):
+    """按名称构造 Generator，seed 可以是整数、SeedSequence 或 None"""
+    if bit_generator not in BIT_GENERATORS:
+        raise ValueError(f"不支持的随机数生成器: {bit_generator}")
+    return np.random.Generator(BIT_GENERATORS[bit_generator](seed))
+
+
+def as_seed_sequence(seed=None):
+    """把整数或 None 转换为 SeedSequence，已经是 SeedSequence 时原样返回"""
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
@@ -0,0 +1,118 @@
+"""整个赛季双循环赛程的蒙特卡洛模拟（多进程并行）"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from random_streams import as_seed_sequence, make_generator
+
+# 每个进程任务模拟的赛季数
+SEASON_BATCH_SIZE = 1000
+
+
+def simulate_season_batch(home_xG, away_xG, remaining, base_table, num_seasons, seed,
+                          distribution='poisson', overdispersion=None, bit_generator='PCG64'):
+    """模拟一批赛季，返回 (积分计数矩阵, 名次计数矩阵)
+
+    home_xG / away_xG 为 N×N 矩阵（行为主队，列为客队），remaining 标记尚未进行的对阵，
+    base_table 为已赛结果的 (积分, 净胜球, 进球) 三行数组。同一批赛季的所有比赛在一次向量化抽样中完成。
+    """
+    rng = make_generator(seed, bit_generator)
+    num_teams = len(home_xG)
+    shape = (num_seasons, num_teams, num_teams)
+
+    if distribution == 'poisson':
+        home_goals = rng.poisson(np.where(remaining, home_xG, 0), shape)
+        away_goals = rng.poisson(np.where(remaining, away_xG, 0), shape)
+    elif distribution == 'negative_binomial':
+        # 负二项分布：n = λ / (过离散 - 1)，p = 1 / 过离散
+        p = 1 / overdispersion
+        home_goals = rng.negative_binomial(np.where(remaining, home_xG, 1) / (overdispersion - 1), p, shape) * remaining
+        away_goals = rng.negative_binomial(np.where(remaining, away_xG, 1) / (overdispersion - 1), p, shape) * remaining
+    else:
+        raise ValueError(f"不支持的分布类型: {distribution}")
+
+    # 主队视角积分，未进行的对阵不计分
+    home_points = (3 * (home_goals > away_goals) + (home_goals == away_goals)) * remaining
+    away_points = (3 * (home_goals < away_goals) + (home_goals == away_goals)) * remaining
+    goal_diffs = home_goals - away_goals
+
+    # 行求和为主场成绩，列求和为客场成绩
+    points = base_table[0] + home_points.sum(axis=2) + away_points.sum(axis=1)
+    goal_difference = base_table[1] + goal_diffs.sum(axis=2) - goal_diffs.sum(axis=1)
+    goals_for = base_table[2] + home_goals.sum(axis=2) + away_goals.sum(axis=1)
+
+    # 排名依次按积分、净胜球、进球数，仍相同时随机决定
+    tie_break = rng.random((num_seasons, num_teams))
+    order = np.lexsort((tie_break, goals_for, goal_difference, points), axis=-1)[:, ::-1]
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(num_teams), axis=-1)
+
+    team_index = np.arange(num_teams)
+    position_counts = np.bincount((team_index * num_teams + positions).ravel(),
+                                  minlength=num_teams * num_teams).reshape(num_teams, num_teams)
+    max_points = int(points.max()) + 1
+    points_counts = np.bincount((team_index * max_points + points).ravel(),
+                                minlength=num_teams * max_points).reshape(num_teams, max_points)
+    return points_counts, position_counts
+
+
+def simulate_season(teams, home_xG, away_xG, num_seasons=10000, distribution='poisson', overdispersion=None,
+                    played=None, top_spots=4, relegation_spots=3, workers=None,
+                    batch_size=SEASON_BATCH_SIZE, seed=None, bit_generator='PCG64'):
+    """模拟剩余双循环赛程，返回 (球队汇总表, 名次概率矩阵, 积分概率矩阵)
+
+    played 为已赛结果 [(主队, 客队, 主队进球, 客队进球), ...]，这些对阵不再模拟。
+    赛季按 batch_size 分批并通过 SeedSequence 派生独立随机流分发到进程池；workers=1 时在当前进程执行。
+    seed 可以是整数或 SeedSequence，相同种子下结果与进程数无关。
+    """
+    teams = list(teams)
+    num_teams = len(teams)
+    index = {team: i for i, team in enumerate(teams)}
+    remaining = ~np.eye(num_teams, dtype=bool)
+    base_table = np.zeros((3, num_teams), dtype=np.int64)
+    for home_team, away_team, home_score, away_score in played or []:
+        home, away = index[home_team], index[away_team]
+        remaining[home, away] = False
+        base_table[0, home] += 3 * (home_score > away_score) + (home_score == away_score)
+        base_table[0, away] += 3 * (home_score < away_score) + (home_score == away_score)
+        base_table[1, home] += home_score - away_score
+        base_table[1, away] += away_score - home_score
+        base_table[2, home] += home_score
+        base_table[2, away] += away_score
+
+    batches = [min(batch_size, num_seasons - start) for start in range(0, num_seasons, batch_size)]
+    seeds = as_seed_sequence(seed).spawn(len(batches))
+    args = [(home_xG, away_xG, remaining, base_table, size, child, distribution, overdispersion, bit_generator)
+            for size, child in zip(batches, seeds)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) == 1:
+        results = [simulate_season_batch(*arg) for arg in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            results = list(executor.map(simulate_season_batch, *zip(*args)))
+
+    # 合并各批次结果（积分直方图长度可能不同）
+    max_points = max(points.shape[1] for points, _ in results)
+    points_counts = np.zeros((num_teams, max_points), dtype=np.int64)
+    position_counts = np.zeros((num_teams, num_teams), dtype=np.int64)
+    for points, positions in results:
+        points_counts[:, :points.shape[1]] += points
+        position_counts += positions
+
+    position_probs = position_counts / num_seasons
+    points_probs = points_counts / num_seasons
+    summary = pd.DataFrame({
+        'team': teams,
+        'expected_points': points_probs @ np.arange(max_points),
+        'expected_position': position_probs @ np.arange(1, num_teams + 1),
+        'title': position_probs[:, 0],
+        f'top_{top_spots}': position_probs[:, :top_spots].sum(axis=1),
+        'relegation': position_probs[:, num_teams - relegation_spots:].sum(axis=1)
+    }).sort_values('expected_points', ascending=False, ignore_index=True)
+
+    return (summary,
+            pd.DataFrame(position_probs, index=teams, columns=np.arange(1, num_teams + 1)),
+            pd.DataFrame(points_probs, index=teams))
@@ -0,0 +1,212 @@
+"""根据历史赛果拟合球队攻防强度：带时间衰减权重的泊松回归极大似然，支持按比赛日增量更新
+
+模型：log(主队进球期望) = μ_主 + 进攻[主队] + 防守[客队]
+      log(客队进球期望) = μ_客 + 进攻[客队] + 防守[主队]
+每场比赛在设计矩阵中各占两行、每行只有 3 个非零元，按下标数组直接累加到 (主队, 客队) 对阵层面的充分统计量，
+对数似然只依赖这些统计量，因此历史比赛越多拟合成本也不会增加；新比赛日到来时先把旧统计量整体按时间衰减，
+再加上新比赛，并以上一次的解为初值做牛顿迭代，通常 2~3 步即可收敛。
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from team_store import DEFAULT_DATA_DIR
+
+# 默认的本地赛果文件
+DEFAULT_RESULTS_PATH = os.path.join(DEFAULT_DATA_DIR, 'results.csv')
+
+RESULT_COLUMNS = ['league', 'date', 'home_team', 'away_team', 'home_goals', 'away_goals']
+
+# 时间衰减半衰期（天）：一场比赛的权重每过这么多天减半
+DECAY_HALF_LIFE_DAYS = 180
+
+# 攻防参数的岭惩罚，消除整体平移的不可识别性并收缩比赛很少的球队
+RIDGE_PENALTY = 0.01
+
+NEWTON_TOLERANCE = 1e-8
+NEWTON_MAX_ITER = 50
+
+
+def read_match_results(path):
+    """读取本地赛果 CSV（league, date, home_team, away_team, home_goals, away_goals）"""
+    results = pd.read_csv(path, encoding='utf-8')
+    missing = [column for column in RESULT_COLUMNS if column not in results.columns]
+    if missing:
+        raise ValueError(f"赛果文件缺少字段: {', '.join(missing)}")
+    results = results[RESULT_COLUMNS].copy()
+    results['date'] = pd.to_datetime(results['date'])
+    return results
+
+
+class LeagueStrengthModel:
+    """单个联赛的充分统计量与当前解
+
+    参数向量 θ = [μ_主, μ_客, 进攻(n), 防守(n)]；统计量为 X^T W y（长度 2n+2）和对阵权重矩阵 (n×n，行为主队)。
+    """
+
+    def __init__(self, league, half_life_days=DECAY_HALF_LIFE_DAYS, ridge=RIDGE_PENALTY):
+        self.league = league
+        self.half_life_days = half_life_days
+        self.decay_rate = np.log(2) / half_life_days
+        self.ridge = ridge
+        self.teams = []
+        self.index = {}
+        self.reference_date = None
+        self.num_matches = 0
+        self.weighted_goals = np.zeros(2)
+        self.pair_weights = np.zeros((0, 0))
+        self.theta = np.zeros(2)
+
+    def _add_teams(self, teams):
+        """登记新出现的球队，统计量和参数向量按零扩展"""
+        new_teams = [team for team in dict.fromkeys(teams) if team not in self.index]
+        if not new_teams:
+            return
+        n_old = len(self.teams)
+        for team in new_teams:
+            self.index[team] = len(self.teams)
+            self.teams.append(team)
+        n = len(self.teams)
+
+        pair_weights = np.zeros((n, n))
+        pair_weights[:n_old, :n_old] = self.pair_weights
+        self.pair_weights = pair_weights
+
+        def grow(vector):
+            head, attack, defense = vector[:2], vector[2:2 + n_old], vector[2 + n_old:]
+            return np.concatenate([head, attack, np.zeros(n - n_old), defense, np.zeros(n - n_old)])
+
+        self.weighted_goals = grow(self.weighted_goals)
+        self.theta = grow(self.theta)
+
+    def add_matches(self, matches, reference_date=None):
+        """衰减已有统计量到新的参考日期，并累加一批比赛"""
+        if reference_date is None:
+            reference_date = matches['date'].max()
+        if self.reference_date is not None:
+            if reference_date < self.reference_date:
+                reference_date = self.reference_date
+            decay = np.exp(-self.decay_rate * (reference_date - self.reference_date).days)
+            self.weighted_goals *= decay
+            self.pair_weights *= decay
+        self.reference_date = reference_date
+
+        self._add_teams(np.concatenate([matches['home_team'].to_numpy(), matches['away_team'].to_numpy()]))
+        n = len(self.teams)
+        home = matches['home_team'].map(self.index).to_numpy(dtype=np.intp)
+        away = matches['away_team'].map(self.index).to_numpy(dtype=np.intp)
+        home_goals = matches['home_goals'].to_numpy(dtype=float)
+        away_goals = matches['away_goals'].to_numpy(dtype=float)
+        age = (reference_date - matches['date']).dt.days.to_numpy(dtype=float)
+        weights = np.exp(-self.decay_rate * age)
+
+        # X^T W y：主队进球行的非零列为 (μ_主, 进攻[主], 防守[客])，客队进球行为 (μ_客, 进攻[客], 防守[主])
+        self.weighted_goals[0] += weights @ home_goals
+        self.weighted_goals[1] += weights @ away_goals
+        self.weighted_goals[2:2 + n] += (np.bincount(home, weights * home_goals, n)
+                                         + np.bincount(away, weights * away_goals, n))
+        self.weighted_goals[2 + n:] += (np.bincount(away, weights * home_goals, n)
+                                        + np.bincount(home, weights * away_goals, n))
+        self.pair_weights += np.bincount(home * n + away, weights, n * n).reshape(n, n)
+        self.num_matches += len(matches)
+
+        if self.num_matches == len(matches):
+            # 冷启动：截距取加权场均进球的对数
+            total_weight = self.pair_weights.sum()
+            self.theta[:2] = np.log(np.maximum(self.weighted_goals[:2], 1e-9) / total_weight)
+
+    def fit(self, tol=NEWTON_TOLERANCE, max_iter=NEWTON_MAX_ITER):
+        """从当前解出发做牛顿迭代，返回迭代次数"""
+        n = len(self.teams)
+        if n == 0:
+            return 0
+        attack, defense = slice(2, 2 + n), slice(2 + n, 2 + 2 * n)
+        penalty = np.full(2 + 2 * n, self.ridge)
+        penalty[:2] = 0
+        for iteration in range(1, max_iter + 1):
+            mu_home, mu_away = self.theta[:2]
+            a, d = self.theta[attack], self.theta[defense]
+            # 对阵层面的加权期望进球：home_rates[i, j] 为主队 i 对客队 j 的主队进球，away_rates[i, j] 为客队 j 的进球
+            home_rates = self.pair_weights * np.exp(mu_home + a[:, None] + d[None, :])
+            away_rates = self.pair_weights * np.exp(mu_away + d[:, None] + a[None, :])
+            home_by_home, home_by_away = home_rates.sum(axis=1), home_rates.sum(axis=0)
+            away_by_home, away_by_away = away_rates.sum(axis=1), away_rates.sum(axis=0)
+
+            expected = np.concatenate([
+                [home_rates.sum(), away_rates.sum()],
+                home_by_home + away_by_away,
+                home_by_away + away_by_home
+            ])
+            gradient = self.weighted_goals - expected - penalty * self.theta
+
+            # 负 Hessian = X^T diag(w·λ) X + 岭惩罚；同类参数之间没有交叉项
+            hessian = np.diag(expected + penalty)
+            hessian[0, attack] = hessian[attack, 0] = home_by_home
+            hessian[0, defense] = hessian[defense, 0] = home_by_away
+            hessian[1, attack] = hessian[attack, 1] = away_by_away
+            hessian[1, defense] = hessian[defense, 1] = away_by_home
+            hessian[attack, defense] = home_rates + away_rates.T
+            hessian[defense, attack] = hessian[attack, defense].T
+
+            step = np.linalg.solve(hessian, gradient)
+            self.theta += step
+            if np.abs(step).max() < tol:
+                break
+        return iteration
+
+    def strengths(self, rates=None):
+        """转换为 FootballPoissonPredictor.get_league_strengths 的强度字典格式"""
+        n = len(self.teams)
+        attack = np.exp(self.theta[2:2 + n])
+        defense = np.exp(self.theta[2 + n:])
+        league_rates = dict(rates or {})
+        league_rates['home_goal_rate'] = float(np.exp(self.theta[0]))
+        league_rates['away_goal_rate'] = float(np.exp(self.theta[1]))
+        return {
+            'teams': list(self.teams),
+            'index': dict(self.index),
+            'rates': league_rates,
+            'home_attack': attack,
+            'home_defense': defense,
+            'away_attack': attack,
+            'away_defense': defense,
+            'source': ('fit', self.half_life_days, self.ridge, self.num_matches, str(self.reference_date.date()))
+        }
+
+
+class StrengthFitter:
+    """全部联赛的强度拟合器：update 传入新比赛后只重新拟合涉及的联赛"""
+
+    def __init__(self, half_life_days=DECAY_HALF_LIFE_DAYS, ridge=RIDGE_PENALTY):
+        self.half_life_days = half_life_days
+        self.ridge = ridge
+        self.models = {}
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_RESULTS_PATH, **kwargs):
+        """读取赛果文件并完成首次拟合"""
+        fitter = cls(**kwargs)
+        fitter.update(read_match_results(path))
+        return fitter
+
+    def leagues(self):
+        """已拟合的联赛名称"""
+        return list(self.models)
+
+    def update(self, matches, reference_date=None):
+        """加入一批比赛（例如一个比赛日）并以上次的解为初值重新拟合，返回 {联赛: 牛顿迭代次数}"""
+        iterations = {}
+        for league, league_matches in matches.groupby('league', sort=False):
+            if league not in self.models:
+                self.models[league] = LeagueStrengthModel(league, self.half_life_days, self.ridge)
+            model = self.models[league]
+            model.add_matches(league_matches, reference_date)
+            iterations[league] = model.fit()
+        return iterations
+
+    def strengths(self, league, rates=None):
+        """联赛的强度字典，rates 中的其他联赛参数（如过离散参数）原样保留"""
+        if league not in self.models:
+            raise ValueError(f"赛果中没有该联赛: {league}")
+        return self.models[league].strengths(rates)
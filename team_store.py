@@ -0,0 +1,177 @@
+"""列式球队数据存储：联赛和球队数据保存为 .npy 文件，按联赛懒加载并内存映射"""
+import os
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+LEAGUE_RATE_COLUMNS = ('home_goal_rate', 'away_goal_rate', 'overdispersion')
+TEAM_STAT_COLUMNS = ('home_goals', 'home_conceded', 'away_goals', 'away_conceded')
+
+# leagues.npy：每个联赛一行，start/stop 为该联赛球队在球队数组中的区间
+LEAGUE_DTYPE = [('name', 'U32')] + [(column, 'f8') for column in LEAGUE_RATE_COLUMNS] + [('start', 'i8'), ('stop', 'i8')]
+
+
+class LeagueTable:
+    """单个联赛的球队数组：球队名、名称到整数下标的索引，以及按列存放的统计数据"""
+
+    def __init__(self, name, rates, teams, stats):
+        self.name = name
+        self.rates = rates
+        self.teams = teams
+        self.stats = stats
+        self.index = {team: i for i, team in enumerate(teams.tolist())}
+
+    def __len__(self):
+        return len(self.teams)
+
+    def column(self, name):
+        """按列名取统计列（长度为球队数的数组）"""
+        return self.stats[TEAM_STAT_COLUMNS.index(name)]
+
+
+class TeamDataStore:
+    """按联赛懒加载的列式球队数据
+
+    构造时不读取任何文件；第一次访问联赛列表时内存映射 leagues.npy，
+    第一次访问某个联赛时才从 team_names.npy / team_stats.npy 中切出该联赛的区间。
+    同一实例由所有会话共享，懒加载在锁内完成，相关字段同时赋值。
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        self._leagues = None
+        self._league_rows = None
+        self._team_names = None
+        self._team_stats = None
+        self._tables = {}
+        self._lock = threading.RLock()
+        self.league_data = LeagueDataView(self)
+        self.team_data = TeamDataView(self)
+
+    def _load(self, filename):
+        return np.load(os.path.join(self.data_dir, filename), mmap_mode='r')
+
+    @property
+    def leagues(self):
+        """联赛结构化数组（内存映射）"""
+        if self._league_rows is None:
+            with self._lock:
+                if self._league_rows is None:
+                    leagues = self._load('leagues.npy')
+                    self._leagues = leagues
+                    # _league_rows 最后赋值，其他线程看到它不为 None 时 _leagues 已就绪
+                    self._league_rows = {name: i for i, name in enumerate(leagues['name'].tolist())}
+        return self._leagues
+
+    def league_names(self):
+        """所有联赛名称"""
+        self.leagues
+        return list(self._league_rows)
+
+    def has_league(self, league):
+        """联赛是否存在"""
+        self.leagues
+        return league in self._league_rows
+
+    def league_rates(self, league):
+        """联赛参数字典（场均主/客进球、过离散参数）"""
+        if not self.has_league(league):
+            raise KeyError(league)
+        row = self.leagues[self._league_rows[league]]
+        return {column: float(row[column]) for column in LEAGUE_RATE_COLUMNS}
+
+    def get_league(self, league):
+        """获取联赛的 LeagueTable（首次访问时加载并缓存）"""
+        table = self._tables.get(league)
+        if table is not None:
+            return table
+        if not self.has_league(league):
+            raise KeyError(league)
+        with self._lock:
+            if league not in self._tables:
+                if self._team_stats is None:
+                    team_names = self._load('team_names.npy')
+                    team_stats = self._load('team_stats.npy')
+                    self._team_names, self._team_stats = team_names, team_stats
+
+                row = self.leagues[self._league_rows[league]]
+                block = slice(int(row['start']), int(row['stop']))
+                self._tables[league] = LeagueTable(league, self.league_rates(league), self._team_names[block], self._team_stats[:, block])
+            return self._tables[league]
+
+
+class LeagueDataView(Mapping):
+    """以 {联赛: {'home_goal_rate': ..., ...}} 字典形式只读访问联赛参数"""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, league):
+        return self._store.league_rates(league)
+
+    def __iter__(self):
+        return iter(self._store.league_names())
+
+    def __len__(self):
+        return len(self._store.league_names())
+
+
+class TeamDataView(Mapping):
+    """以 {联赛: {球队: {'home_goals': ..., ...}}} 字典形式只读访问球队数据"""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, league):
+        if not self._store.has_league(league):
+            raise KeyError(league)
+        return LeagueTeamsView(self._store.get_league(league))
+
+    def __iter__(self):
+        return iter(self._store.league_names())
+
+    def __len__(self):
+        return len(self._store.league_names())
+
+
+class LeagueTeamsView(Mapping):
+    """单个联赛的 {球队: 统计字典} 只读视图"""
+
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, team):
+        i = self._table.index[team]
+        return {column: float(value) for column, value in zip(TEAM_STAT_COLUMNS, self._table.stats[:, i])}
+
+    def __iter__(self):
+        return iter(self._table.index)
+
+    def __len__(self):
+        return len(self._table)
+
+
+def write_team_store(league_data, team_data, data_dir=DEFAULT_DATA_DIR):
+    """把嵌套字典形式的联赛/球队数据写成列式 .npy 文件"""
+    leagues = np.zeros(len(league_data), dtype=LEAGUE_DTYPE)
+    names = []
+    stats = []
+    for i, (league, rates) in enumerate(league_data.items()):
+        teams = team_data.get(league, {})
+        leagues[i]['name'] = league
+        for column in LEAGUE_RATE_COLUMNS:
+            leagues[i][column] = rates[column]
+        leagues[i]['start'] = len(names)
+        for team, team_stats in teams.items():
+            names.append(team)
+            stats.append([team_stats[column] for column in TEAM_STAT_COLUMNS])
+        leagues[i]['stop'] = len(names)
+
+    os.makedirs(data_dir, exist_ok=True)
+    np.save(os.path.join(data_dir, 'leagues.npy'), leagues)
+    np.save(os.path.join(data_dir, 'team_names.npy'), np.array(names, dtype=str))
+    # 按列存放：每个统计量是一段连续内存
+    np.save(os.path.join(data_dir, 'team_stats.npy'), np.ascontiguousarray(np.array(stats, dtype=float).reshape(-1, len(TEAM_STAT_COLUMNS)).T))
@@ -0,0 +1,87 @@
+"""大小球与亚洲让球结算：累计表查询与逐个比分暴力结算一致"""
+import numpy as np
+import pytest
+
+from football_predictor import FootballPoissonPredictor
+from markets import MarketTables, split_line
+
+TOTAL_LINES = np.arange(-0.5, 9.01, 0.25)
+HANDICAP_LINES = np.arange(-4.5, 4.51, 0.25)
+
+
+def settle(score_matrix, margin, line):
+    """逐个比分结算：每个半盘/整盘下等额注，margin(主队进球, 客队进球) + 盘口 > 0 为赢，= 0 为走"""
+    parts = split_line(line)
+    win = push = lose = 0.0
+    for (home_goals, away_goals), prob in np.ndenumerate(score_matrix):
+        for part in parts:
+            outcome = margin(home_goals, away_goals) + part
+            if outcome > 0:
+                win += prob / len(parts)
+            elif outcome == 0:
+                push += prob / len(parts)
+            else:
+                lose += prob / len(parts)
+    return win, push, lose
+
+
+@pytest.fixture(params=['poisson', 'negative_binomial', 'random'])
+def score_matrix(request):
+    if request.param == 'random':
+        # 非方阵、不归一化的任意矩阵，覆盖截断后行列数不同和总概率不为 1 的情况
+        return np.random.default_rng(7).random((8, 6))
+    predictor = FootballPoissonPredictor(seed=1)
+    return predictor.calculate_exact_score_matrix(1.65, 1.25, '英超', request.param)
+
+
+@pytest.mark.parametrize('line', TOTAL_LINES)
+def test_over_under_matches_brute_force(score_matrix, line):
+    # 大球：总进球 - 盘口 > 0 为赢
+    expected = settle(score_matrix, lambda home, away: home + away, -line)
+    np.testing.assert_allclose(MarketTables(score_matrix).over_under(line), expected, atol=1e-12)
+
+
+@pytest.mark.parametrize('line', HANDICAP_LINES)
+def test_asian_handicap_matches_brute_force(score_matrix, line):
+    expected = settle(score_matrix, lambda home, away: home - away, line)
+    np.testing.assert_allclose(MarketTables(score_matrix).asian_handicap(line), expected, atol=1e-12)
+
+
+def test_price_ladder_matches_brute_force(score_matrix):
+    """价格表中每一行（包括小球和客队让球的镜像行）都与暴力结算一致"""
+    margins = {
+        ('total', 'over'): (lambda home, away: home + away, -1),
+        ('total', 'under'): (lambda home, away: -(home + away), 1),
+        ('asian_handicap', 'home'): (lambda home, away: home - away, 1),
+        ('asian_handicap', 'away'): (lambda home, away: away - home, 1),
+    }
+    ladder = MarketTables(score_matrix).price_ladder()
+    checked = 0
+    for row in ladder.itertuples():
+        if (row.market, row.selection) not in margins:
+            continue
+        margin, sign = margins[row.market, row.selection]
+        expected = settle(score_matrix, margin, sign * row.line)
+        np.testing.assert_allclose((row.win, row.push, row.lose), expected, atol=1e-12)
+        checked += 1
+    # 除胜平负和双方进球的 5 行外全部核对
+    assert checked == len(ladder) - 5
+
+
+def test_match_result_and_btts_match_brute_force(score_matrix):
+    tables = MarketTables(score_matrix)
+    home_goals, away_goals = np.indices(score_matrix.shape)
+    expected = (score_matrix[home_goals > away_goals].sum(), score_matrix[home_goals == away_goals].sum(),
+                score_matrix[home_goals < away_goals].sum())
+    np.testing.assert_allclose(tables.match_result(), expected, atol=1e-12)
+    np.testing.assert_allclose(tables.both_teams_to_score(), score_matrix[1:, 1:].sum(), atol=1e-12)
+
+
+@pytest.mark.parametrize('line, parts', [(2.5, (2.5,)), (3, (3.0,)), (2.25, (2.0, 2.5)), (-0.75, (-1.0, -0.5))])
+def test_split_line(line, parts):
+    assert split_line(line) == parts
+
+
+def test_split_line_rejects_non_quarter_lines():
+    with pytest.raises(ValueError):
+        split_line(2.1)
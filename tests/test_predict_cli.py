@@ -0,0 +1,54 @@
+"""命令行批量预测：结果与进程数无关，无法解析的行只产生该行的错误记录"""
+import io
+import json
+
+import pytest
+
+from predict_cli import OUTPUT_COLUMNS, main, predict_stream, read_fixtures
+
+FIXTURES = [
+    ('英超', '利物浦', '阿森纳'),
+    ('西甲', '皇家马德里', '巴塞罗那'),
+    ('英超', '阿森纳', '不存在的球队'),
+    ('英超', '切尔西', '利物浦'),
+    ('不存在的联赛', 'a', 'b'),
+    ('西甲', '巴塞罗那', '皇家马德里'),
+]
+
+
+@pytest.mark.parametrize('method', ['exact', 'monte_carlo'])
+def test_results_do_not_depend_on_worker_count(method):
+    runs = [list(predict_stream(FIXTURES, 'poisson', method, 2000, seed=7, workers=workers, batch_size=2))
+            for workers in (1, 2)]
+    assert runs[0] == runs[1]
+    assert [bool(record.get('error')) for record in runs[0]] == [False, False, True, False, True, False]
+
+
+def test_malformed_jsonl_rows_become_error_records():
+    lines = [
+        {'league': '英超', 'home_team': '利物浦', 'away_team': '阿森纳'},
+        {'league': ['x'], 'home_team': 'a', 'away_team': 'b'},
+        {'league': '英超', 'home_team': 3, 'away_team': '阿森纳'},
+        {'league': '英超', 'home_team': '利物浦'},
+        ['英超', '利物浦', '阿森纳'],
+    ]
+    stream = io.StringIO('\n'.join(json.dumps(line, ensure_ascii=False) for line in lines) + '\nnot json\n')
+    rows = list(read_fixtures(stream, 'jsonl'))
+    assert rows[0] == ('英超', '利物浦', '阿森纳')
+    assert all(isinstance(row, dict) and row['error'] for row in rows[1:])
+
+    records = list(predict_stream(rows, seed=1))
+    assert len(records) == len(rows)
+    assert 'error' not in records[0] and 'home_win' in records[0]
+
+
+def test_csv_with_bom_and_missing_columns(tmp_path):
+    path = tmp_path / 'fixtures.csv'
+    path.write_text('league,home_team,away_team\n英超,利物浦,阿森纳\n英超,利物浦\n', encoding='utf-8-sig')
+    output = tmp_path / 'predictions.csv'
+    assert main([str(path), '-o', str(output), '--output-format', 'csv']) == 0
+
+    header, *rows = output.read_text(encoding='utf-8').splitlines()
+    assert header.split(',') == OUTPUT_COLUMNS
+    assert rows[0].startswith('英超,利物浦,阿森纳,') and rows[0].endswith(',')
+    assert rows[1].endswith('缺少字段: away_team')
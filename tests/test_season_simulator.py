@@ -0,0 +1,28 @@
+"""赛季模拟：相同种子下结果与进程数无关"""
+import pandas as pd
+import pytest
+
+from football_predictor import FootballPoissonPredictor
+from season_simulator import simulate_season
+
+
+@pytest.mark.parametrize('distribution', ['poisson', 'negative_binomial'])
+def test_results_do_not_depend_on_worker_count(distribution):
+    predictor = FootballPoissonPredictor(seed=1)
+    teams, home_xG, away_xG = predictor.calculate_expected_goals_matrix('英超')
+    played = [(teams[0], teams[1], 2, 1), (teams[2], teams[3], 0, 0)]
+    runs = [simulate_season(teams, home_xG, away_xG, 3000, distribution, 1.3, played, workers=workers,
+                            batch_size=500, seed=2024)
+            for workers in (1, 2)]
+    for single, pooled in zip(*runs):
+        pd.testing.assert_frame_equal(single, pooled, check_exact=True)
+
+
+def test_played_matches_are_not_simulated():
+    """全部对阵已赛时，积分表就是已赛结果"""
+    teams = ['A', 'B']
+    played = [('A', 'B', 2, 0), ('B', 'A', 1, 1)]
+    expected_goals = [[0.0, 1.5], [1.5, 0.0]]
+    summary, positions, _ = simulate_season(teams, expected_goals, expected_goals, 200, played=played, workers=1, seed=3)
+    assert summary.set_index('team')['expected_points'].to_dict() == {'A': 4.0, 'B': 1.0}
+    assert positions.loc['A', 1] == 1.0
@@ -0,0 +1,49 @@
+"""敏感性网格：广播一次算出的每个网格点都与单独解析计算该点的结果一致"""
+import numpy as np
+import pytest
+
+from football_predictor import SENSITIVITY_MARKETS, FootballPoissonPredictor
+from markets import MarketTables
+
+
+def point_markets(score_matrix):
+    """用 MarketTables 的累计表逐个计算网格市场，不复用 market_probability_grid 的掩码"""
+    tables = MarketTables(score_matrix)
+    home, draw, away = tables.match_result()
+    return {
+        'home_win': home,
+        'draw': draw,
+        'away_win': away,
+        'prob_gt_2_5': tables.over_under(2.5)[0],
+        'prob_gt_3_5': tables.over_under(3.5)[0],
+        'both_teams_score': tables.both_teams_to_score(),
+        'prob_7_plus': tables.total_mass - tables.total_at_most(6),
+        'margin_3_plus': tables.diff_at_least(3) + tables.diff_at_most(-3),
+    }
+
+
+@pytest.mark.parametrize('max_goals', [10, 15])
+def test_grid_matches_per_point_exact_results(max_goals):
+    predictor = FootballPoissonPredictor(seed=1)
+    home_xG, away_xG = predictor.calculate_expected_goals('利物浦', '阿森纳', '英超')
+    home_scales = np.linspace(0.8, 1.2, 5)
+    away_scales = np.linspace(0.7, 1.3, 4)
+    # 过离散参数 ≤ 1 的点按泊松分布计算
+    overdispersions = np.array([0.9, 1.0, 1.15, 1.5, 2.0])
+    grid = predictor.sensitivity_grid(home_xG, away_xG, home_scales, away_scales, overdispersions, max_goals)
+    assert set(grid['markets']) == set(SENSITIVITY_MARKETS)
+
+    for k, overdispersion in enumerate(overdispersions):
+        for i, home_scale in enumerate(home_scales):
+            for j, away_scale in enumerate(away_scales):
+                if overdispersion <= 1:
+                    score_matrix = predictor.calculate_exact_score_matrix(
+                        home_xG * home_scale, away_xG * away_scale, max_goals=max_goals)
+                else:
+                    score_matrix = predictor.calculate_exact_score_matrix(
+                        home_xG * home_scale, away_xG * away_scale, distribution='negative_binomial',
+                        max_goals=max_goals, overdispersion=overdispersion)
+                for market, expected in point_markets(score_matrix).items():
+                    assert grid['markets'][market][k, i, j] == pytest.approx(expected, abs=1e-12), (market, k, i, j)
+    np.testing.assert_allclose(grid['home_xG'], home_xG * home_scales)
+    np.testing.assert_allclose(grid['away_xG'], away_xG * away_scales)
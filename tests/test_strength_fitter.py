@@ -0,0 +1,84 @@
+"""历史赛果强度拟合：按比赛日增量更新与一次性全量拟合结果一致，且全量解满足原始数据的似然方程"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from strength_fitter import StrengthFitter
+
+
+def synthetic_results(seed=5):
+    """两个联赛、每周一个比赛日的模拟赛果；第二个联赛有一支球队从赛季中途才出现"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for league, num_teams in (('甲联赛', 8), ('乙联赛', 6)):
+        teams = [f"{league}球队{i}" for i in range(num_teams)]
+        attack = rng.normal(0, 0.3, num_teams)
+        defense = rng.normal(0, 0.3, num_teams)
+        for week in range(30):
+            date = pd.Timestamp('2023-08-05') + pd.Timedelta(weeks=week)
+            active = teams if league == '甲联赛' or week >= 12 else teams[:-1]
+            order = rng.permutation(len(active))
+            for home, away in zip(order[::2], order[1::2]):
+                home_team, away_team = active[home], active[away]
+                h, a = teams.index(home_team), teams.index(away_team)
+                rows.append((league, date, home_team, away_team,
+                             rng.poisson(np.exp(0.35 + attack[h] + defense[a])),
+                             rng.poisson(np.exp(0.1 + attack[a] + defense[h]))))
+    return pd.DataFrame(rows, columns=['league', 'date', 'home_team', 'away_team', 'home_goals', 'away_goals'])
+
+
+def by_team(fitter, league):
+    strengths = fitter.strengths(league)
+    return {team: (strengths['home_attack'][i], strengths['home_defense'][i]) for team, i in strengths['index'].items()}
+
+
+@pytest.fixture(scope='module')
+def results():
+    return synthetic_results()
+
+
+def test_incremental_refit_matches_full_refit(results):
+    full = StrengthFitter()
+    full.update(results)
+
+    incremental = StrengthFitter()
+    first_weeks = results['date'] < pd.Timestamp('2023-10-01')
+    incremental.update(results[first_weeks])
+    for _, matchday in results[~first_weeks].groupby('date'):
+        incremental.update(matchday)
+
+    for league in full.leagues():
+        full_model, incremental_model = full.models[league], incremental.models[league]
+        assert incremental_model.num_matches == full_model.num_matches
+        assert incremental_model.reference_date == full_model.reference_date
+        np.testing.assert_allclose(incremental_model.theta[:2], full_model.theta[:2], atol=1e-8)
+        expected = by_team(full, league)
+        actual = by_team(incremental, league)
+        assert actual.keys() == expected.keys()
+        for team, values in expected.items():
+            np.testing.assert_allclose(actual[team], values, rtol=1e-7)
+
+
+def test_full_fit_solves_the_weighted_likelihood_equations(results):
+    """用原始比赛逐场计算带时间衰减权重的梯度，验证充分统计量的累加和牛顿解"""
+    fitter = StrengthFitter()
+    fitter.update(results)
+    for league, matches in results.groupby('league'):
+        model = fitter.models[league]
+        n = len(model.teams)
+        home = matches['home_team'].map(model.index).to_numpy()
+        away = matches['away_team'].map(model.index).to_numpy()
+        age = (model.reference_date - matches['date']).dt.days.to_numpy()
+        weights = np.exp(-np.log(2) / model.half_life_days * age)
+
+        mu_home, mu_away = model.theta[:2]
+        attack, defense = model.theta[2:2 + n], model.theta[2 + n:]
+        home_residual = weights * (matches['home_goals'].to_numpy() - np.exp(mu_home + attack[home] + defense[away]))
+        away_residual = weights * (matches['away_goals'].to_numpy() - np.exp(mu_away + attack[away] + defense[home]))
+        gradient = np.concatenate([
+            [home_residual.sum(), away_residual.sum()],
+            np.bincount(home, home_residual, n) + np.bincount(away, away_residual, n),
+            np.bincount(away, home_residual, n) + np.bincount(home, away_residual, n)
+        ])
+        gradient[2:] -= model.ridge * model.theta[2:]
+        np.testing.assert_allclose(gradient, 0, atol=1e-8)
@@ -0,0 +1,127 @@
+"""方差缩减抽样：为比分矩阵逆变换抽样提供拟随机点和重要性抽样提议分布
+
+抽样方式:
+    antithetic       对偶变量，u 与 1 - u 成对使用
+    latin_hypercube  拉丁超立方，每一维的 n 个等分区间各取一个点
+    sobol            二维 Sobol 序列，随机数字平移（XOR）保持低差异性且估计无偏
+    importance       重要性抽样：原分布与偏向大比分、大分差的倾斜分布按比例混合，用 Sobol 点对混合分布 q 逆变换，
+                     样本按 p / q 加权
+
+每一块样本使用独立的随机化，块与块之间互相独立，可以用块间方差估计标准误。
+"""
+import numpy as np
+
+SAMPLING_METHODS = ('random', 'antithetic', 'latin_hypercube', 'sobol', 'importance')
+
+# Sobol 序列的二进制位数（单块最多 2^32 个点）
+SOBOL_BITS = 32
+
+# 重要性抽样提议分布：原分布所占比例（保证权重不超过 1 / DEFENSIVE_SHARE），其余由两个倾斜分布平分
+DEFENSIVE_SHARE = 0.5
+
+# 倾斜分布的目标均值：总进球倾斜到 7 球附近，净胜球绝对值倾斜到 3 球附近
+TAIL_TOTAL_TARGET = 7.0
+TAIL_DIFF_TARGET = 3.0
+
+
+def _sobol_directions():
+    """前两维的方向数：第一维为范德科皮特序列，第二维对应本原多项式 x + 1"""
+    first = np.array([1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)], dtype=np.uint64)
+    second = [1 << (SOBOL_BITS - 1)]
+    for _ in range(SOBOL_BITS - 1):
+        second.append(second[-1] ^ (second[-1] >> 1))
+    return np.stack([first, np.array(second, dtype=np.uint64)], axis=1).astype(np.uint32)
+
+
+_SOBOL_DIRECTIONS = _sobol_directions()
+
+
+def sobol_points(n, rng):
+    """n 个二维 Sobol 点（格雷码顺序），每一维异或一个随机整数做数字平移，返回 (n, 2) 的 (0, 1) 均匀数"""
+    if n > 1 << SOBOL_BITS:
+        raise ValueError(f"单块 Sobol 点数不能超过 2^{SOBOL_BITS}")
+    # 格雷码顺序下第 i 个点 = 第 i - 1 个点 XOR 第 c 个方向数，c 为 i 最低位 1 的位置
+    index = np.arange(1, n, dtype=np.int64)
+    lowest_bit = np.log2(index & -index).astype(np.intp)
+    points = np.empty((n, 2), dtype=np.uint32)
+    points[0] = rng.integers(0, 1 << SOBOL_BITS, size=2, dtype=np.uint32)
+    points[1:] = _SOBOL_DIRECTIONS[lowest_bit]
+    np.bitwise_xor.accumulate(points, axis=0, out=points)
+    return (points + 0.5) * 2.0 ** -SOBOL_BITS
+
+
+def latin_hypercube_points(n, rng, dims=2):
+    """n 个拉丁超立方点，返回 (n, dims)"""
+    strata = np.stack([rng.permutation(n) for _ in range(dims)], axis=1)
+    return (strata + rng.random((n, dims))) / n
+
+
+def antithetic_points(n, rng, dims=2):
+    """对偶均匀数：前一半为 u，后一半为 1 - u（n 为奇数时多出的一个点不配对）"""
+    half = rng.random(((n + 1) // 2, dims))
+    return np.concatenate([half, 1 - half])[:n]
+
+
+def uniform_points(method, n, rng):
+    """按抽样方式生成 (n, 2) 的均匀数；importance 与 sobol 相同，random 使用普通伪随机数"""
+    if method in ('sobol', 'importance'):
+        return sobol_points(n, rng)
+    if method == 'latin_hypercube':
+        return latin_hypercube_points(n, rng)
+    if method == 'antithetic':
+        return antithetic_points(n, rng)
+    if method == 'random':
+        return rng.random((n, 2))
+    raise ValueError(f"不支持的抽样方式: {method}")
+
+
+def invert_score_matrix(score_matrix, points):
+    """二维逆变换：第一维按主队进球边缘分布，第二维按给定主队进球时客队进球的条件分布
+
+    返回 (主队进球, 客队进球)。独立模型下条件分布就是客队边缘分布，相当于分别对两队的累计分布求逆。
+    """
+    rows, cols = score_matrix.shape
+    home_cdf = np.cumsum(score_matrix.sum(axis=1))
+    home_goals = np.minimum(np.searchsorted(home_cdf / home_cdf[-1], points[:, 0], side='right'), rows - 1)
+
+    # 第 i 行的条件累计分布平移到 (i, i+1]，一次 searchsorted 完成所有行
+    conditional = np.cumsum(score_matrix, axis=1)
+    conditional /= np.where(conditional[:, -1:] > 0, conditional[:, -1:], 1)
+    conditional += np.arange(rows)[:, None]
+    flat = np.searchsorted(conditional.ravel(), points[:, 1] + home_goals, side='right')
+    away_goals = np.minimum(flat - home_goals * cols, cols - 1)
+    return home_goals, away_goals
+
+
+def tilt_score_matrix(score_matrix, statistic, target, max_theta=5.0, iterations=60):
+    """指数倾斜 q ∝ p · exp(θ · statistic)，二分求 θ 使 statistic 的均值达到 target（已达到时不倾斜）"""
+    def tilted(theta):
+        log_weights = theta * statistic
+        weights = score_matrix * np.exp(log_weights - log_weights.max())
+        return weights / weights.sum()
+
+    if (score_matrix * statistic).sum() / score_matrix.sum() >= target:
+        return score_matrix / score_matrix.sum()
+    low, high = 0.0, max_theta
+    for _ in range(iterations):
+        theta = (low + high) / 2
+        if (tilted(theta) * statistic).sum() < target:
+            low = theta
+        else:
+            high = theta
+    return tilted(low)
+
+
+def importance_proposal(score_matrix):
+    """防御性混合提议分布 q，以及每个比分的权重 p / q"""
+    score_matrix = score_matrix / score_matrix.sum()
+    rows, cols = score_matrix.shape
+    total_goals = np.add.outer(np.arange(rows), np.arange(cols)).astype(float)
+    goal_diff = np.abs(np.subtract.outer(np.arange(rows), np.arange(cols))).astype(float)
+
+    tail_share = (1 - DEFENSIVE_SHARE) / 2
+    proposal = (DEFENSIVE_SHARE * score_matrix
+                + tail_share * tilt_score_matrix(score_matrix, total_goals, TAIL_TOTAL_TARGET)
+                + tail_share * tilt_score_matrix(score_matrix, goal_diff, TAIL_DIFF_TARGET))
+    weights = np.divide(score_matrix, proposal, out=np.zeros_like(score_matrix), where=proposal > 0)
+    return proposal, weights